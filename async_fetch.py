@@ -0,0 +1,87 @@
+import asyncio
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+
+class AsyncFetcher:
+    def __init__(self, fingerprint=None, concurrency=32, per_host=8, host_limits=None, timeout=20, limiter=None, retries=2, backoff=2.0):
+        if aiohttp is None:
+            raise RuntimeError('Missing dependency: aiohttp. Install via pip install aiohttp')
+
+        fingerprint = fingerprint or {}
+        self.headers = dict(DEFAULT_HEADERS)
+        if fingerprint.get('user_agent'):
+            self.headers['User-Agent'] = fingerprint['user_agent']
+        if fingerprint.get('cookie'):
+            self.headers['Cookie'] = fingerprint['cookie']
+
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_limits = host_limits or {}
+        self.timeout = timeout
+        # Shared AdaptiveRateLimiter: paces requests per host and backs off on 403/429.
+        self.limiter = limiter
+        # Timeouts, 5xx and 403/429 are retried after backoff * 2^n seconds; other errors are not.
+        self.retries = retries
+        self.backoff = backoff
+        self.failures = 0
+        self.semaphores = {}
+        self.session = None
+
+    async def __aenter__(self):
+        # One connector for the whole run so search and detail pages share keep-alive connections.
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    def host_semaphore(self, url):
+        host = urlparse(url).hostname or ''
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host))
+        return self.semaphores[host]
+
+    async def fetch(self, url):
+        # None once the retries are used up; the caller skips the page rather than switching engines.
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            html_text, retry = await self._fetch_once(url)
+            if html_text is not None or not retry:
+                break
+        if html_text is None:
+            self.failures += 1
+        return html_text
+
+    async def _fetch_once(self, url):
+        if self.limiter is not None:
+            delay = self.limiter.reserve(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with self.host_semaphore(url):
+            try:
+                async with self.session.get(url) as response:
+                    if response.status >= 400:
+                        print(f'fetch {url} failed: HTTP {response.status}')
+                        if self.limiter is not None and response.status in (403, 429):
+                            self.limiter.blocked(url)
+                        return None, response.status in (403, 429) or response.status >= 500
+                    return await response.text(errors='ignore'), False
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                print(f'fetch {url} failed: {exc!r}')
+                return None, True
@@ -4,6 +4,7 @@ import argparse
 import html
 import json
 import re
+import threading
 import time
 from dataclasses import dataclass
 from typing import Optional
@@ -13,13 +14,26 @@ from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
-try:
-    import pymysql
-except ImportError:
-    pymysql = None
+from browser_profiles import BrowserSessions, add_browser_arguments, open_browser_sessions
+from checkpoint import CheckpointStore, add_checkpoint_arguments
+from crawl_pool import WorkerPool
+from db import add_db_arguments, config_from_args, open_pool
+from fast_load import BLOCK_PROFILES, STATS as TRANSFER_STATS, apply_block_profile, configure_options
+from job_writer import HASH_COLUMNS, content_hash
+from page_cache import PageCache, add_cache_arguments, open_cache
+from rate_limit import AdaptiveRateLimiter, add_rate_arguments, open_rate_limiter
+from readiness import STATS as WAIT_STATS, wait_for_selector
 
 FINGERPRINT_FILE = "1.txt"
 
+DESC_SELECTORS = [
+    "dd[data-selector='job-intro-content']",
+    ".job-intro-container dd[data-selector='job-intro-content']",
+    ".job-intro-container .paragraph dd",
+]
+OFFLINE_MARKERS = ["该职位已下线", "职位不存在", "页面不存在"]
+SECURITY_MARKERS = ["安全验证", "访问验证"]
+
 
 @dataclass
 class Fingerprint:
@@ -49,7 +63,7 @@ def read_fingerprint(file_path: str) -> Fingerprint:
     )
 
 
-def apply_cookies(driver: webdriver.Chrome, cookie_string: str) -> None:
+def apply_cookies(driver: webdriver.Chrome, cookie_string: str, expiry: Optional[float] = None) -> None:
     if not cookie_string:
         return
     pairs = [c.strip() for c in cookie_string.split(";") if c.strip()]
@@ -57,19 +71,28 @@ def apply_cookies(driver: webdriver.Chrome, cookie_string: str) -> None:
         if "=" not in pair:
             continue
         name, value = pair.split("=", 1)
+        item = {
+            "name": name.strip(),
+            "value": value.strip(),
+            "domain": ".liepin.com",
+        }
+        if expiry:
+            # Without an expiry Chrome drops it on exit instead of keeping it in the profile.
+            item["expiry"] = int(expiry)
         try:
-            driver.add_cookie(
-                {
-                    "name": name.strip(),
-                    "value": value.strip(),
-                    "domain": ".liepin.com",
-                }
-            )
+            driver.add_cookie(item)
         except Exception:
             continue
 
 
-def create_driver(headless: bool, use_fingerprint: bool, fp: Fingerprint) -> webdriver.Chrome:
+def create_driver(
+    headless: bool,
+    use_fingerprint: bool,
+    fp: Fingerprint,
+    block_profile: str = "off",
+    sessions: Optional[BrowserSessions] = None,
+    index: int = 0,
+) -> webdriver.Chrome:
     opts = Options()
     opts.add_argument("--disable-blink-features=AutomationControlled")
     opts.add_argument("--disable-gpu")
@@ -77,12 +100,25 @@ def create_driver(headless: bool, use_fingerprint: bool, fp: Fingerprint) -> web
     opts.add_argument("--disable-dev-shm-usage")
     if headless:
         opts.add_argument("--headless=new")
+    browser_session = sessions.configure(opts, index) if sessions is not None else None
+    attached = sessions is not None and bool(sessions.attach)
     if use_fingerprint and fp.user_agent:
         opts.add_argument(f"--user-agent={fp.user_agent}")
+    configure_options(opts, block_profile, attached)
 
-    driver = webdriver.Chrome(options=opts)
-    driver.implicitly_wait(6)
+    try:
+        driver = webdriver.Chrome(options=opts)
+    except Exception:
+        if sessions is not None:
+            sessions.release(browser_session)
+        raise
+    driver.browser_session = browser_session
+    if attached and use_fingerprint and fp.user_agent:
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": fp.user_agent})
+    # fetch_desc waits through readiness.py; an implicit wait would stall on every missing selector.
+    driver.implicitly_wait(0)
     driver.set_page_load_timeout(35)
+    apply_block_profile(driver, block_profile)
 
     if use_fingerprint and fp.xsrf_token:
         driver.execute_cdp_cmd("Network.enable", {})
@@ -94,39 +130,35 @@ def create_driver(headless: bool, use_fingerprint: bool, fp: Fingerprint) -> web
     return driver
 
 
-def get_db_connection(host: str, port: int, user: str, password: str, database: str):
-    if pymysql is None:
-        raise RuntimeError("Missing dependency: pymysql. Install via pip install pymysql")
-
-    return pymysql.connect(
-        host=host,
-        port=port,
-        user=user,
-        password=password,
-        database=database,
-        charset="utf8mb4",
-        autocommit=True,
-    )
-
-
-def load_rows(connection, limit: int, only_empty: bool):
+def load_rows(connection, limit: int, only_empty: bool, after_id: int = 0):
+    # Keyset page: the id range scan stops after `limit` matches instead of sorting the table.
+    # Plain comparisons on skills (no TRIM/LOWER) keep the predicate cheap to evaluate.
     sql = (
         "SELECT id, job_url, skills FROM jobs "
-        "WHERE job_url IS NOT NULL AND TRIM(job_url) <> '' "
-        "AND job_url LIKE 'https://www.liepin.com/%%' "
+        "WHERE id > %s AND job_url LIKE 'https://www.liepin.com/%%' "
     )
     if only_empty:
-        sql += (
-            "AND (skills IS NULL OR TRIM(skills) = '' OR TRIM(skills) = '[]' "
-            "OR LOWER(TRIM(skills)) = 'null') "
-        )
+        sql += "AND (skills IS NULL OR skills IN ('', '[]', 'null', 'NULL')) "
     sql += "ORDER BY id ASC LIMIT %s"
 
     with connection.cursor() as cursor:
-        cursor.execute(sql, (limit,))
+        cursor.execute(sql, (after_id, limit))
         return cursor.fetchall()
 
 
+def iter_row_chunks(db, only_empty: bool, after_id: int = 0, chunk_size: int = 500, limit: int = 0):
+    remaining = limit if limit > 0 else None
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        rows = db.run(load_rows, limit=size, only_empty=only_empty, after_id=after_id)
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+
+
 def normalize_text(text: str) -> str:
     if not text:
         return ""
@@ -148,23 +180,51 @@ def parse_desc_from_html(page_source: str) -> str:
     return normalize_text(html.unescape(raw))
 
 
-def fetch_desc(driver: webdriver.Chrome, url: str, wait: float, retries: int = 2) -> Optional[str]:
-    selectors = [
-        "dd[data-selector='job-intro-content']",
-        ".job-intro-container dd[data-selector='job-intro-content']",
-        ".job-intro-container .paragraph dd",
-    ]
+def fetch_desc(
+    driver: Optional[webdriver.Chrome],
+    url: str,
+    wait: float,
+    retries: int = 2,
+    cache: Optional[PageCache] = None,
+    offline: bool = False,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+) -> Optional[str]:
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        if any(marker in cached for marker in OFFLINE_MARKERS):
+            return None
+        parsed = parse_desc_from_html(cached)
+        if parsed:
+            return parsed
+    # A cached page the regex cannot parse still gets a live visit, where the DOM lookup may succeed.
+    if offline:
+        return None
 
     for attempt in range(1, retries + 1):
         try:
+            if limiter is not None:
+                limiter.wait(url)
             driver.get(url)
-            time.sleep(wait)
+            wait_for_selector(driver, DESC_SELECTORS, wait, texts=OFFLINE_MARKERS, label="liepin_detail")
+            TRANSFER_STATS.record(driver, "liepin_detail")
 
             source = driver.page_source
-            if "该职位已下线" in source or "职位不存在" in source or "页面不存在" in source:
+            if any(marker in source for marker in SECURITY_MARKERS):
+                # Backs the shared limiter off; the retry then waits for the slower rate.
+                print(f"security verification on {url}")
+                if limiter is not None:
+                    limiter.blocked(url)
+                continue
+            if limiter is not None:
+                limiter.success(url)
+            offline_page = any(marker in source for marker in OFFLINE_MARKERS)
+            # Timed-out or half-rendered pages are not cached, or they would stay broken until the TTL.
+            if cache is not None and (offline_page or parse_desc_from_html(source)):
+                cache.put(url, source)
+            if offline_page:
                 return None
 
-            for selector in selectors:
+            for selector in DESC_SELECTORS:
                 nodes = driver.find_elements(By.CSS_SELECTOR, selector)
                 if not nodes:
                     continue
@@ -188,72 +248,195 @@ def fetch_desc(driver: webdriver.Chrome, url: str, wait: float, retries: int = 2
     return None
 
 
-def update_skills(connection, job_id: int, desc: str) -> None:
-    payload = json.dumps([desc], ensure_ascii=False)
-    sql = "UPDATE jobs SET skills=%s, updated_at=CURRENT_TIMESTAMP WHERE id=%s"
-    with connection.cursor() as cursor:
-        cursor.execute(sql, (payload, job_id))
+def update_skills_batch(connection, items) -> int:
+    # One UPDATE ... CASE per batch instead of a round trip per row. skills is part of
+    # content_hash, so the hashes are recomputed from the locked rows in the same transaction.
+    if not items:
+        return 0
+    skills = {job_id: json.dumps([desc], ensure_ascii=False) for job_id, desc in items}
+    placeholders = ", ".join(["%s"] * len(skills))
+    select_sql = f"SELECT id, {', '.join(HASH_COLUMNS)} FROM jobs WHERE id IN ({placeholders}) FOR UPDATE"
+    connection.begin()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(select_sql, list(skills))
+            hashes = {}
+            for row in cursor.fetchall():
+                item = dict(zip(HASH_COLUMNS, row[1:]))
+                item["skills"] = skills[row[0]]
+                hashes[row[0]] = content_hash(item)
+            if not hashes:
+                connection.commit()
+                return 0
+            cases = " ".join(["WHEN %s THEN %s"] * len(hashes))
+            sql = (
+                f"UPDATE jobs SET skills=CASE id {cases} END, content_hash=CASE id {cases} END, "
+                f"updated_at=CURRENT_TIMESTAMP WHERE id IN ({', '.join(['%s'] * len(hashes))})"
+            )
+            params = []
+            for job_id in hashes:
+                params.extend([job_id, skills[job_id]])
+            for job_id, row_hash in hashes.items():
+                params.extend([job_id, row_hash])
+            params.extend(hashes)
+            updated = cursor.execute(sql, params)
+        connection.commit()
+        return updated
+    except Exception:
+        connection.rollback()
+        raise
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Backfill jobs.skills from Liepin job detail by job_url")
-    parser.add_argument("--host", default="127.0.0.1")
-    parser.add_argument("--port", type=int, default=3306)
-    parser.add_argument("--user", default="root")
-    parser.add_argument("--password", default="root")
-    parser.add_argument("--database", default="recruitment_system")
+    add_db_arguments(parser, legacy=True)
 
-    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=200, help="Max rows to process, 0 = the whole table")
     parser.add_argument("--all", action="store_true", help="Process all rows, not only empty skills")
     parser.add_argument("--headless", action="store_true", help="Run browser headless")
-    parser.add_argument("--wait", type=float, default=1.5)
+    parser.add_argument("--wait", type=float, default=8, help="Max seconds to wait for the description to render")
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--use-fingerprint", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel browser workers fetching detail pages")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows read per keyset page")
+    parser.add_argument("--batch-size", type=int, default=50, help="Rows written per batched UPDATE")
+    parser.add_argument(
+        "--block-profile",
+        choices=sorted(BLOCK_PROFILES),
+        default="lite",
+        help="lite: skip images/media/fonts/trackers; strict: also CSS; off: load everything",
+    )
+    add_cache_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_browser_arguments(parser)
+    add_rate_arguments(parser)
 
     args = parser.parse_args()
 
     fp = read_fingerprint(FINGERPRINT_FILE) if args.use_fingerprint else Fingerprint()
-    connection = get_db_connection(args.host, args.port, args.user, args.password, args.database)
-    driver = create_driver(args.headless, args.use_fingerprint, fp)
-
-    try:
-        if args.use_fingerprint:
+    cache = open_cache(args)
+    sessions = open_browser_sessions(args)
+    limiter = open_rate_limiter(args)
+    checkpoints = CheckpointStore(args.checkpoint)
+    cursor_name = f"backfill|{config_from_args(args).database}|{'all' if args.all else 'empty'}"
+    last_id = checkpoints.start_cursor(cursor_name, args.resume)
+    if last_id:
+        print(f"resume: after id={last_id}")
+    db = open_pool(args)
+
+    def make_driver(index: int) -> Optional[webdriver.Chrome]:
+        # Offline runs re-parse cached pages only, so no browser is needed.
+        if args.offline:
+            return None
+        driver = create_driver(args.headless, args.use_fingerprint, fp, args.block_profile, sessions, index)
+        if not args.use_fingerprint:
+            return driver
+        if sessions is None:
             driver.get("https://www.liepin.com/")
             apply_cookies(driver, fp.cookie)
+        elif sessions.needs_bootstrap(driver.browser_session, "liepin", fp.cookie):
+            driver.get("https://www.liepin.com/")
+            apply_cookies(driver, fp.cookie, expiry=time.time() + sessions.session_seconds)
+            sessions.mark_warm(driver.browser_session, "liepin", fp.cookie)
+        return driver
+
+    def close_driver(driver: Optional[webdriver.Chrome]) -> None:
+        if driver is not None:
+            driver.quit()
+            if sessions is not None:
+                sessions.release(driver.browser_session)
+
+    pool = WorkerPool(1 if args.offline else args.workers, make_driver, close_driver)
+    lock = threading.Lock()
+    counts = {"total": 0, "updated": 0, "skipped": 0, "failed": 0}
+    pending = []
+    failed_ids = []
+
+    def flush(force: bool = False) -> bool:
+        with lock:
+            if not pending or (not force and len(pending) < args.batch_size):
+                return True
+            items = pending[:]
+            pending.clear()
+        try:
+            db.run(update_skills_batch, items)
+        except Exception as exc:
+            with lock:
+                counts["updated"] -= len(items)
+                counts["failed"] += len(items)
+                failed_ids.extend(job_id for job_id, _desc in items)
+            print(f"batch update failed ids={items[0][0]}..{items[-1][0]}, error={exc}")
+            return False
+        return True
+
+    def process_row(driver: Optional[webdriver.Chrome], job_id: int, job_url: str) -> None:
+        desc = fetch_desc(driver, job_url, wait=args.wait, cache=cache, offline=args.offline, limiter=limiter)
+        with lock:
+            counts["total"] += 1
+            idx = counts["total"]
+            if desc:
+                counts["updated"] += 1
+                if not args.dry_run:
+                    pending.append((job_id, desc))
+            else:
+                counts["skipped"] += 1
+        if not desc:
+            print(f"[{idx}] skip id={job_id} url={job_url}")
+            return
+        print(f"[{idx}] {'dry-run' if args.dry_run else 'fetched'} id={job_id}, desc_len={len(desc)}")
+        flush()
 
-        rows = load_rows(connection, limit=args.limit, only_empty=(not args.all))
-        total = len(rows)
-        print(f"loaded {total} rows")
-
-        updated = 0
-        skipped = 0
-        failed = 0
-
-        for idx, (job_id, job_url, _skills) in enumerate(rows, start=1):
-            desc = fetch_desc(driver, job_url, wait=args.wait)
-            if not desc:
-                skipped += 1
-                print(f"[{idx}/{total}] skip id={job_id} url={job_url}")
-                continue
-
-            if args.dry_run:
-                updated += 1
-                print(f"[{idx}/{total}] dry-run id={job_id}, desc_len={len(desc)}")
-                continue
-
-            try:
-                update_skills(connection, job_id, desc)
-                updated += 1
-                print(f"[{idx}/{total}] updated id={job_id}, desc_len={len(desc)}")
-            except Exception as exc:
-                failed += 1
-                print(f"[{idx}/{total}] update failed id={job_id}, error={exc}")
-
-        print(f"done: total={total}, updated={updated}, skipped={skipped}, failed={failed}")
+    try:
+        pool.start()
+        chunks = iter_row_chunks(
+            db,
+            only_empty=(not args.all),
+            after_id=last_id,
+            chunk_size=args.chunk_size,
+            limit=args.limit,
+        )
+        for rows in chunks:
+            if not all(pool.submit(process_row, job_id, job_url) for job_id, job_url, _skills in rows):
+                print("all workers stopped, aborting")
+                break
+            # Each chunk is finished and written before the next page is read, so memory
+            # stays bounded and the cursor never runs ahead of saved rows.
+            pool.wait()
+            if not flush(force=True) or failed_ids:
+                # Keep the cursor below the first failed row so --resume retries it, and stop
+                # rather than run ahead of rows that were never written.
+                first_failed = min(failed_ids)
+                saved = [job_id for job_id, _url, _skills in rows if job_id < first_failed]
+                if saved:
+                    checkpoints.set_cursor(cursor_name, saved[-1])
+                print(f"stopping: update failed, cursor kept before id={first_failed}")
+                break
+            if not args.dry_run:
+                checkpoints.set_cursor(cursor_name, rows[-1][0])
+            print(f"chunk up to id={rows[-1][0]} done, processed={counts['total']}")
+        pool.join()
+        flush(force=True)
+
+        print(
+            f"done: total={counts['total']}, updated={counts['updated']}, "
+            f"skipped={counts['skipped']}, failed={counts['failed']}"
+        )
+        wait_summary = WAIT_STATS.summary()
+        if wait_summary:
+            print(wait_summary)
+        transfer_summary = TRANSFER_STATS.summary(args.block_profile)
+        if transfer_summary:
+            print(transfer_summary)
     finally:
-        driver.quit()
-        connection.close()
-
+        pool.join()
+        db.close()
+        print(db.summary())
+        if cache is not None:
+            print(cache.summary())
+            cache.close()
+        if sessions is not None:
+            print(sessions.summary())
+        print(limiter.summary())
 
 if __name__ == "__main__":
     main()
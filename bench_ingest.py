@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from db import add_db_arguments, open_pool
+from job_writer import StagingWriter, upsert_jobs
+
+BENCH_SOURCE = 'bench'
+
+
+def make_records(count, run_id):
+    crawl_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    records = []
+    for index in range(count):
+        salary_min = 8000 + index % 20 * 500
+        records.append({
+            'title': f'Python 开发工程师 {index % 500}',
+            'company': f'示例公司 {index % 3000}',
+            'salary': f'{salary_min // 1000}-{salary_min // 1000 + 6}K',
+            'salary_min': salary_min,
+            'salary_max': salary_min + 6000,
+            'salary_avg': salary_min + 3000,
+            'location': '上海',
+            'experience': '3-5年',
+            'education': '本科',
+            'industry': '互联网',
+            'job_type': '全职',
+            'company_nature': '民营',
+            'company_size': '100-499人',
+            'job_url': f'https://bench.invalid/{run_id}/{index}',
+            'skills': json.dumps(['Python', 'MySQL', 'Docker\tK8s', 'line\nbreak'], ensure_ascii=False),
+            'source': BENCH_SOURCE,
+            'company_logo': '',
+            'crawl_date': crawl_date,
+        })
+    return records
+
+
+def delete_bench_rows(connection):
+    with connection.cursor() as cursor:
+        return cursor.execute('DELETE FROM jobs WHERE source=%s', (BENCH_SOURCE,))
+
+
+def count_bench_rows(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM jobs WHERE source=%s', (BENCH_SOURCE,))
+        return cursor.fetchone()[0]
+
+
+def bench_upsert(db, records, page_size):
+    started = time.perf_counter()
+    for start in range(0, len(records), page_size):
+        db.run(upsert_jobs, records[start:start + page_size])
+    return time.perf_counter() - started
+
+
+def bench_bulk(db, records, page_size, staging_file):
+    writer = StagingWriter(db, path=staging_file, batch_rows=len(records))
+    started = time.perf_counter()
+    for start in range(0, len(records), page_size):
+        writer.write(records[start:start + page_size])
+    writer.close()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-page upserts with the LOAD DATA bulk ingest path')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=40, help='Rows per save_to_mysql call, like one search page')
+    parser.add_argument('--staging-file', default='.bench_staging.tsv')
+    parser.add_argument('--keep', action='store_true', help=f"Keep the source='{BENCH_SOURCE}' rows afterwards")
+    add_db_arguments(parser)
+    args = parser.parse_args()
+
+    db = open_pool(args, local_infile=True)
+    run_id = int(time.time())
+    records = make_records(args.rows, run_id)
+    try:
+        db.run(delete_bench_rows)
+        upsert_seconds = bench_upsert(db, records, args.page_size)
+        upserted = db.run(count_bench_rows)
+
+        db.run(delete_bench_rows)
+        bulk_seconds = bench_bulk(db, records, args.page_size, args.staging_file)
+        loaded = db.run(count_bench_rows)
+
+        # Second pass over identical rows: the content hash should turn it into crawl_date-only updates.
+        rerun_seconds = bench_bulk(db, records, args.page_size, args.staging_file)
+
+        print(f'rows={args.rows} page_size={args.page_size}')
+        print(f'per-page upsert: {upsert_seconds:.2f}s ({upserted} rows)')
+        print(f'bulk ingest:     {bulk_seconds:.2f}s ({loaded} rows), {upsert_seconds / max(bulk_seconds, 1e-9):.1f}x faster')
+        print(f'bulk re-ingest:  {rerun_seconds:.2f}s (unchanged rows)')
+    finally:
+        if not args.keep:
+            db.run(delete_bench_rows)
+        if os.path.exists(args.staging_file):
+            os.remove(args.staging_file)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import time
+
+from job_zhilian import extract_initial_state
+
+
+def legacy_extract_initial_state(page_source):
+    # The previous per-character brace matcher, kept here as the baseline.
+    idx = page_source.find('__INITIAL_STATE__')
+    if idx < 0:
+        return None
+    start = page_source.find('{', idx)
+    if start < 0:
+        return None
+
+    level = 0
+    in_string = False
+    escaped = False
+    end = -1
+    for i in range(start, len(page_source)):
+        ch = page_source[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == '{':
+            level += 1
+        elif ch == '}':
+            level -= 1
+            if level == 0:
+                end = i + 1
+                break
+    if end < 0:
+        return None
+
+    text = page_source[start:end]
+    try:
+        return json.loads(text)
+    except Exception:
+        text = re.sub(r',\s*}', '}', text)
+        text = re.sub(r',\s*]', ']', text)
+        try:
+            return json.loads(text)
+        except Exception:
+            return None
+
+
+def synthetic_page(jobs=400):
+    positions = []
+    for index in range(jobs):
+        positions.append({
+            'name': f'Python 开发工程师 {index}',
+            'companyName': f'示例公司 {index}',
+            'salary60': '15-25K·13薪',
+            'positionURL': f'https://jobs.zhaopin.com/{index}.htm',
+            'jobSummary': '负责后端服务开发 {"braces": [1, 2]} \\ "quoted" ' * 8,
+            'skillLabel': [{'value': 'Python'}, {'value': 'MySQL'}],
+        })
+    state = {'positionList': positions, 'searchParams': {'kw': 'python', 'p': 1}}
+    filler = '<div class="x">' + '<span>placeholder</span>' * 2000 + '</div>'
+    return f'<html><head>{filler}</head><body><script>window.__INITIAL_STATE__={json.dumps(state, ensure_ascii=False)};</script>{filler}</body></html>'
+
+
+def load_fixtures(pattern):
+    pages = []
+    for path in sorted(glob.glob(pattern)):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+        if '__INITIAL_STATE__' in text:
+            pages.append((os.path.basename(path), text))
+    return pages
+
+
+def time_call(func, page, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(page)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark __INITIAL_STATE__ extraction on saved Zhilian search pages')
+    parser.add_argument('--fixtures', default='tests/fixtures/*.html*', help='Glob of saved search pages (.html or .html.gz)')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per page and extractor')
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f'no fixtures matched {args.fixtures}, using a synthetic page')
+        pages = [('synthetic', synthetic_page())]
+
+    legacy_total = 0.0
+    current_total = 0.0
+    for name, page in pages:
+        legacy_seconds, legacy_state = time_call(legacy_extract_initial_state, page, args.repeat)
+        current_seconds, current_state = time_call(extract_initial_state, page, args.repeat)
+        legacy_total += legacy_seconds
+        current_total += current_seconds
+        same = 'same' if legacy_state == current_state else 'DIFFERENT'
+        print(
+            f'{name}: {len(page) / 1024:.0f}KB legacy={legacy_seconds * 1000:.2f}ms '
+            f'current={current_seconds * 1000:.2f}ms speedup={legacy_seconds / max(current_seconds, 1e-9):.1f}x result={same}'
+        )
+    print(
+        f'total over {len(pages)} pages: legacy={legacy_total * 1000:.1f}ms current={current_total * 1000:.1f}ms '
+        f'speedup={legacy_total / max(current_total, 1e-9):.1f}x'
+    )
+
+
+if __name__ == '__main__':
+    main()
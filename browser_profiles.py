@@ -0,0 +1,247 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PROFILE_DIR = '.chrome_profiles'
+DEFAULT_SESSION_HOURS = 12
+LEASE_FILE = '.lease'
+SESSION_FILE = 'session.json'
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def cookie_digest(cookie_string):
+    return hashlib.blake2b((cookie_string or '').encode('utf-8'), digest_size=8).hexdigest()
+
+
+class BrowserSessions:
+    # Hands each browser worker a warm Chrome: either its own persistent user-data-dir under
+    # `root` (slot-N, leased per process so two runs never share one), or an already running
+    # Chrome reached over its debugger address. Chrome keeps cache and cookies in the profile,
+    # so the home page + add_cookie bootstrap only runs when the profile has not seen this
+    # cookie recently.
+    def __init__(self, root=DEFAULT_PROFILE_DIR, attach='', session_hours=DEFAULT_SESSION_HOURS):
+        self.root = Path(root) if root else None
+        self.attach = attach
+        self.session_seconds = session_hours * 3600
+        self.lock = threading.Lock()
+        self.leased = set()
+        self.warm = 0
+        self.cold = 0
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def attach_address(self, index):
+        # Worker N attaches to port + N, the layout `browser_profiles.py serve --count` starts.
+        host, _, port = self.attach.rpartition(':')
+        return f'{host or "127.0.0.1"}:{int(port) + index}'
+
+    def configure(self, chrome_options, index=0):
+        if self.attach:
+            address = self.attach_address(index)
+            chrome_options.add_experimental_option('debuggerAddress', address)
+            return address
+        path = self.lease()
+        chrome_options.add_argument(f'--user-data-dir={path.resolve()}')
+        return path
+
+    def lease(self):
+        with self.lock:
+            slot = 0
+            while True:
+                path = self.root / f'slot-{slot}'
+                if path not in self.leased and self._claim(path):
+                    self.leased.add(path)
+                    return path
+                slot += 1
+
+    def _claim(self, path):
+        path.mkdir(parents=True, exist_ok=True)
+        lease = path / LEASE_FILE
+        try:
+            fd = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                owner = int(lease.read_text().strip() or 0)
+            except (OSError, ValueError):
+                owner = 0
+            if owner and owner != os.getpid() and pid_alive(owner):
+                return False
+            # Left behind by a crashed run.
+            lease.unlink(missing_ok=True)
+            return self._claim(path)
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def release(self, handle):
+        if not isinstance(handle, Path):
+            return
+        with self.lock:
+            self.leased.discard(handle)
+            (handle / LEASE_FILE).unlink(missing_ok=True)
+
+    def _session_path(self, handle):
+        if isinstance(handle, Path):
+            return handle / SESSION_FILE
+        return self.root / f'attach-{handle.replace(":", "_")}.json' if self.root else None
+
+    def _read_sessions(self, handle):
+        path = self._session_path(handle)
+        if path is None or not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def needs_bootstrap(self, handle, site, cookie_string):
+        entry = self._read_sessions(handle).get(site) or {}
+        fresh = time.time() - entry.get('warmed_at', 0) < self.session_seconds
+        warm = fresh and entry.get('cookie') == cookie_digest(cookie_string)
+        with self.lock:
+            if warm:
+                self.warm += 1
+            else:
+                self.cold += 1
+        return not warm
+
+    def mark_warm(self, handle, site, cookie_string):
+        path = self._session_path(handle)
+        if path is None:
+            return
+        sessions = self._read_sessions(handle)
+        sessions[site] = {'cookie': cookie_digest(cookie_string), 'warmed_at': time.time()}
+        path.write_text(json.dumps(sessions), encoding='utf-8')
+
+    def summary(self):
+        where = f'attach {self.attach}' if self.attach else f'profiles {self.root}'
+        return f'browser sessions ({where}): warm={self.warm} bootstrapped={self.cold}'
+
+
+def add_browser_arguments(parser):
+    parser.add_argument(
+        '--profile-dir',
+        nargs='?',
+        const=DEFAULT_PROFILE_DIR,
+        default='',
+        help='Reuse persistent Chrome profiles under this directory (one slot per browser worker)',
+    )
+    parser.add_argument(
+        '--chrome-attach',
+        default='',
+        help='Attach to running Chrome at host:port instead of launching one; worker N uses port + N',
+    )
+    parser.add_argument(
+        '--session-hours',
+        type=float,
+        default=DEFAULT_SESSION_HOURS,
+        help='Re-inject fingerprint cookies into a profile after this many hours',
+    )
+
+
+def open_browser_sessions(args):
+    if not args.profile_dir and not args.chrome_attach:
+        return None
+    # Attach mode still keeps its session markers next to the profiles.
+    root = args.profile_dir or (DEFAULT_PROFILE_DIR if args.chrome_attach else '')
+    return BrowserSessions(root, attach=args.chrome_attach, session_hours=args.session_hours)
+
+
+def find_chrome(binary=''):
+    if binary:
+        return binary
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError('Chrome not found, pass --chrome-binary')
+
+
+def serve(args):
+    # Long-lived browsers for --chrome-attach: one Chrome per port, each on its own profile slot.
+    binary = find_chrome(args.chrome_binary)
+    sessions = BrowserSessions(args.profile_dir)
+    processes = []
+    try:
+        for index in range(args.count):
+            path = sessions.lease()
+            command = [
+                binary,
+                f'--remote-debugging-port={args.port + index}',
+                f'--user-data-dir={path.resolve()}',
+                '--no-first-run',
+                '--no-default-browser-check',
+                '--disable-blink-features=AutomationControlled',
+            ]
+            if args.headless:
+                command.append('--headless=new')
+            processes.append((path, subprocess.Popen(command)))
+            print(f'chrome {index}: 127.0.0.1:{args.port + index} profile={path}')
+        print(f'attach with --chrome-attach 127.0.0.1:{args.port}; Ctrl+C to stop')
+        while all(process.poll() is None for _, process in processes):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for path, process in processes:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            sessions.release(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage persistent Chrome profiles shared by the crawlers')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='Start long-lived Chrome instances for --chrome-attach')
+    serve_parser.add_argument('--port', type=int, default=9222, help='Debugger port of the first instance')
+    serve_parser.add_argument('--count', type=int, default=1, help='Instances to start, one per browser worker')
+    serve_parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR)
+    serve_parser.add_argument('--chrome-binary', default='')
+    serve_parser.add_argument('--headless', action='store_true')
+
+    list_parser = sub.add_parser('list', help='Show profile slots and their session state')
+    list_parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args)
+        return
+
+    root = Path(args.profile_dir)
+    for path in sorted(root.glob('slot-*')):
+        lease = path / LEASE_FILE
+        owner = lease.read_text().strip() if lease.exists() else ''
+        if owner and not pid_alive(int(owner)):
+            owner = ''
+        sessions = {}
+        if (path / SESSION_FILE).exists():
+            sessions = json.loads((path / SESSION_FILE).read_text(encoding='utf-8'))
+        state = ', '.join(
+            f"{site} {(time.time() - entry.get('warmed_at', 0)) / 3600:.1f}h ago" for site, entry in sessions.items()
+        )
+        print(f"{path.name}: {'in use by pid ' + owner if owner else 'free'}; warmed: {state or 'never'}")
+
+
+if __name__ == '__main__':
+    main()
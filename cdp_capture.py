@@ -0,0 +1,130 @@
+import base64
+import collections
+import fnmatch
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import trio
+except ImportError:
+    trio = None
+
+
+@dataclass
+class CapturedResponse:
+    url: str
+    status: Optional[int]
+    body: Optional[str]
+
+
+class NetworkCapture:
+    # Intercepts matching responses through the CDP Fetch domain, so Chrome only reports the
+    # requests we asked for instead of logging every image, font and script of the page.
+    def __init__(self, driver, body_patterns, status_patterns=(), max_responses=200):
+        self.driver = driver
+        self.body_patterns = list(body_patterns)
+        self.status_patterns = list(status_patterns)
+        self.captured = collections.deque(maxlen=max_responses)
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.thread = None
+        self.token = None
+        self.scope = None
+        self.error = None
+
+    def start(self, timeout=15):
+        if trio is None:
+            raise RuntimeError('Missing dependency: trio. Install via pip install trio')
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout) or self.error is not None:
+            raise RuntimeError(f'CDP network capture failed to start: {self.error!r}')
+        return self
+
+    def stop(self):
+        if self.scope is not None and self.token is not None:
+            try:
+                trio.from_thread.run_sync(self.scope.cancel, trio_token=self.token)
+            except Exception:
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def clear(self):
+        with self.lock:
+            self.captured.clear()
+
+    def responses(self):
+        with self.lock:
+            return list(self.captured)
+
+    def has_body(self, url_part):
+        with self.lock:
+            return any(item.body and url_part in item.url for item in self.captured)
+
+    def _run(self):
+        try:
+            trio.run(self._listen)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.ready.set()
+
+    async def _listen(self):
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            patterns = [
+                devtools.fetch.RequestPattern(
+                    url_pattern=url_pattern,
+                    resource_type=devtools.network.ResourceType(resource_type) if resource_type else None,
+                    request_stage=devtools.fetch.RequestStage.RESPONSE,
+                )
+                for url_pattern, resource_type in self.body_patterns + self.status_patterns
+            ]
+            events = session.listen(devtools.fetch.RequestPaused, buffer_size=256)
+            await session.execute(devtools.fetch.enable(patterns=patterns))
+
+            self.token = trio.lowlevel.current_trio_token()
+            with trio.CancelScope() as scope:
+                self.scope = scope
+                self.ready.set()
+                async for event in events:
+                    await self._handle(session, devtools, event)
+
+            try:
+                await session.execute(devtools.fetch.disable())
+            except Exception:
+                pass
+
+    async def _handle(self, session, devtools, event):
+        url = event.request.url
+        status = event.response_status_code
+        resource_type = event.resource_type.value if event.resource_type else None
+        body = None
+        try:
+            if status is not None and status < 400 and self._matches(self.body_patterns, url, resource_type):
+                body, encoded = await session.execute(devtools.fetch.get_response_body(event.request_id))
+                if encoded:
+                    body = base64.b64decode(body).decode('utf-8', errors='ignore')
+        except Exception:
+            body = None
+        finally:
+            # A paused request stalls the page until it is released.
+            try:
+                await session.execute(devtools.fetch.continue_request(event.request_id))
+            except Exception:
+                pass
+
+        with self.lock:
+            self.captured.append(CapturedResponse(url=url, status=status, body=body))
+
+    @staticmethod
+    def _matches(patterns, url, resource_type):
+        for url_pattern, pattern_type in patterns:
+            if pattern_type and pattern_type != resource_type:
+                continue
+            if fnmatch.fnmatchcase(url, url_pattern):
+                return True
+        return False
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CHECKPOINT_FILE = '.crawl_checkpoint.json'
+
+
+@contextmanager
+def file_lock(path):
+    # Cross-process lock on a side file, so the checkpoint itself can still be replaced atomically.
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CheckpointStore:
+    # Several crawls (job.py, job_zhilian.py, parallel shell loops) share one file. Every save
+    # re-reads it under a file lock and only replaces the key this process changed.
+    def __init__(self, path=DEFAULT_CHECKPOINT_FILE):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.lock = threading.Lock()
+        with file_lock(self.lock_path):
+            self.data = self._load()
+
+    def _load(self):
+        data = {'crawls': {}, 'cursors': {}}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            data['crawls'].update(loaded.get('crawls', {}))
+            data['cursors'].update(loaded.get('cursors', {}))
+        return data
+
+    @staticmethod
+    def crawl_key(source, base_url, keyword):
+        return f'{source}|{base_url}|{keyword}'
+
+    def _crawl(self, key):
+        return self.data['crawls'].setdefault(key, {'done_pages': [], 'pending_details': {}})
+
+    def start_crawl(self, key, resume):
+        with self.lock:
+            if not resume:
+                self.data['crawls'].pop(key, None)
+            crawl = self._crawl(key)
+            self._save('crawls', key)
+            return set(crawl['done_pages']), dict(crawl['pending_details'])
+
+    def mark_page_done(self, key, page, pending_details=None):
+        # Pending details are stored with the page so a crash never loses queued detail URLs.
+        with self.lock:
+            crawl = self._crawl(key)
+            if page not in crawl['done_pages']:
+                crawl['done_pages'].append(page)
+            crawl['pending_details'].update(pending_details or {})
+            self._save('crawls', key)
+
+    def detail_done(self, key, job_url):
+        with self.lock:
+            if self._crawl(key)['pending_details'].pop(job_url, None) is not None:
+                self._save('crawls', key)
+
+    def start_cursor(self, name, resume):
+        with self.lock:
+            if not resume:
+                self.data['cursors'].pop(name, None)
+                self._save('cursors', name)
+            return self.data['cursors'].get(name, 0)
+
+    def set_cursor(self, name, value):
+        with self.lock:
+            self.data['cursors'][name] = value
+            self._save('cursors', name)
+
+    def _save(self, section, key):
+        with file_lock(self.lock_path):
+            merged = self._load()
+            if key in self.data[section]:
+                merged[section][key] = self.data[section][key]
+            else:
+                merged[section].pop(key, None)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+def add_checkpoint_arguments(parser):
+    parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint of the same run')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_FILE, help='Checkpoint file path')
@@ -0,0 +1,249 @@
+import argparse
+import threading
+import time
+from functools import partial
+
+import job
+import job_zhilian
+from browser_profiles import add_browser_arguments, open_browser_sessions
+from checkpoint import CheckpointStore, add_checkpoint_arguments
+from crawl_pool import WorkerPool
+from db import add_db_arguments, open_pool
+from fast_load import BLOCK_PROFILES, STATS as TRANSFER_STATS
+from fingerprint_pool import add_fingerprint_pool_arguments, open_fingerprint_pool
+from incremental import load_known_urls, touch_jobs
+from job_writer import add_writer_arguments, open_writer, writer_connect_kwargs
+from page_cache import add_cache_arguments, open_cache
+from pagination import add_pagination_arguments, open_paginator, page_stats
+from rate_limit import add_rate_arguments, open_rate_limiter
+from readiness import STATS as WAIT_STATS
+from scheduler import CrawlScheduler, load_spec
+
+
+def search_url(query, page):
+    if query.source == 'zhilian':
+        return job_zhilian.build_search_url(job_zhilian.keyword_search_url(query.city, query.keyword), page)
+    # Liepin counts pages from 0.
+    return job.build_search_url(
+        job.LIEPIN_SEARCH_URL,
+        page - 1,
+        page_size=job.LIEPIN_PAGE_SIZE,
+        key=query.keyword,
+        city=query.city,
+    )
+
+
+def query_key(query):
+    return CheckpointStore.crawl_key(f'crawl:{query.source}', query.city, query.keyword)
+
+
+class WorkerBrowsers:
+    # One lazily opened browser per source and worker, so a worker can switch sites between pages.
+    # With --chrome-attach, zhilian worker N uses port + N and liepin worker N port + workers + N.
+    def __init__(self, index, fingerprints, workers=1):
+        self.index = index
+        self.fingerprints = fingerprints
+        self.workers = workers
+        self.drivers = {}
+
+    def get(self, source):
+        if source not in self.drivers:
+            if source == 'zhilian':
+                self.drivers[source] = job_zhilian.open_session(self.fingerprints['zhilian'], self.index)
+            else:
+                index = self.workers + self.index
+                fingerprint = self.fingerprints['liepin']
+                if job.FINGERPRINT_POOL is not None:
+                    fingerprint = job.FINGERPRINT_POOL.acquire(index)
+                self.drivers[source] = job.open_session(fingerprint, index)
+        return self.drivers[source]
+
+    def close(self):
+        for source, driver in self.drivers.items():
+            try:
+                if source == 'zhilian':
+                    job_zhilian.close_driver(driver)
+                else:
+                    job.close_session(driver)
+            except Exception as exc:
+                print(f'worker {self.index} failed to close {source} browser: {exc}')
+        self.drivers = {}
+
+
+def configure_crawlers(args):
+    # job.py and job_zhilian.py keep their settings in module globals, set here instead of in their __main__.
+    sessions = open_browser_sessions(args)
+    limiter = open_rate_limiter(args)
+    for module in (job, job_zhilian):
+        module.HEADLESS = bool(args.headless)
+        module.USE_FINGERPRINT = bool(args.use_fingerprint)
+        module.NETWORK_CAPTURE = args.capture
+        module.BLOCK_PROFILE = args.block_profile
+        module.BROWSER_SESSIONS = sessions
+        module.RATE_LIMITER = limiter
+    job_zhilian.PAGE_CACHE = open_cache(args)
+    job_zhilian.OFFLINE = bool(args.offline)
+    job_zhilian.SKILL_TAGGER = job_zhilian.load_tagger(args.skills_dir, job_zhilian.COMMON_SKILLS)
+    job_zhilian.FINGERPRINT_POOL = open_fingerprint_pool(args, 'zhilian')
+    job.FINGERPRINT_POOL = open_fingerprint_pool(args, 'liepin')
+
+    fingerprints = {
+        'zhilian': job_zhilian.read_fingerprint(job_zhilian.FINGERPRINT_FILE) if args.use_fingerprint else {},
+        'liepin': job.read_fingerprint(job.FINGERPRINT_FILE) if args.use_fingerprint else {},
+    }
+    if job_zhilian.FINGERPRINT_POOL is not None:
+        job_zhilian.USE_FINGERPRINT = True
+    if job.FINGERPRINT_POOL is not None:
+        job.USE_FINGERPRINT = True
+    return limiter, fingerprints
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run every keyword x city x source query of a crawl spec in one scheduled run')
+    parser.add_argument('spec', help='Job-spec JSON file, see crawl_spec.example.json')
+    parser.add_argument('--workers', type=int, default=2, help='Browser workers shared by all queries and sources')
+    parser.add_argument('--with-detail', action='store_true', help='Open zhilian detail pages for skills while listing')
+    parser.add_argument('--skills-dir', default=job_zhilian.SKILLS_DIR, help='Directory for fallback skills json files')
+    parser.add_argument('--page-wait', type=float, default=job_zhilian.PAGE_WAIT, help='Max seconds to wait for a search page')
+    parser.add_argument('--detail-wait', type=float, default=job_zhilian.DETAIL_WAIT, help='Max seconds to wait for a detail page')
+    parser.add_argument('--headless', action='store_true', help='Run chrome in headless mode')
+    parser.add_argument('--use-fingerprint', action='store_true', help='Use the .env fingerprints of both sites')
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip jobs already stored for each source; only refresh their crawl_date/status',
+    )
+    parser.add_argument('--block-profile', choices=sorted(BLOCK_PROFILES), default='lite')
+    parser.add_argument('--capture', choices=['cdp', 'log'], default='cdp')
+    add_cache_arguments(parser)
+    add_browser_arguments(parser)
+    add_fingerprint_pool_arguments(parser)
+    add_rate_arguments(parser)
+    add_pagination_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_writer_arguments(parser)
+    add_db_arguments(parser)
+    args = parser.parse_args()
+
+    queries = load_spec(args.spec)
+    if not queries:
+        print(f'{args.spec} expands to no queries')
+        return
+
+    limiter, fingerprints = configure_crawlers(args)
+    skill_lib = job_zhilian.load_skills_library(args.skills_dir)
+    store = CheckpointStore(args.checkpoint)
+    for query in queries:
+        done_pages, _pending = store.start_crawl(query_key(query), args.resume)
+        if done_pages:
+            query.start_page = max(done_pages) + 1
+
+    db = open_pool(args, **writer_connect_kwargs(args))
+    writer = open_writer(args, db)
+    job.JOB_WRITER = writer
+    job_zhilian.JOB_WRITER = writer
+
+    sources = {query.source for query in queries}
+    seen_urls = {source: set() for source in sources}
+    known_urls = {}
+    if args.incremental:
+        for source in sources:
+            known_urls[source] = db.run(load_known_urls, source)
+            print(f'incremental: {len(known_urls[source])} known {source} jobs')
+
+    scheduler = CrawlScheduler(queries, search_url, limiter, partial(open_paginator, args))
+    totals_lock = threading.Lock()
+    totals = {'pages': 0, 'saved': 0, 'touched': 0}
+    print(f'{args.spec}: {len(queries)} queries, {args.workers} workers')
+
+    def run_page(browsers, query, page):
+        driver = browsers.get(query.source)
+        url = search_url(query, page)
+        known = known_urls.get(query.source)
+        on_commit = partial(store.mark_page_done, query_key(query), page)
+        stats = page_stats()
+        if query.source == 'zhilian':
+            records = job_zhilian.get_data(
+                driver,
+                url,
+                seen_urls=seen_urls['zhilian'],
+                keyword=query.keyword,
+                skill_lib=skill_lib,
+                detail_wait=args.detail_wait,
+                with_detail=args.with_detail,
+                page_wait=args.page_wait,
+                known_urls=known,
+                stats=stats,
+            )
+            saved, touched = job_zhilian.save_page(db, records, known, on_commit)
+        else:
+            records = job.get_data(
+                driver,
+                url,
+                seen_urls['liepin'],
+                page_wait=args.page_wait,
+                known_urls=known,
+                capture=driver.network_capture,
+                stats=stats,
+            )
+            saved = job.save_to_mysql(db, records, on_commit)
+            touched = db.run(touch_jobs, known.take()) if known is not None else 0
+        with totals_lock:
+            totals['pages'] += 1
+            totals['saved'] += saved
+            totals['touched'] += touched
+        print(f'{query.label} page {page}: {stats["new"]}/{stats["listed"]} new, saved {saved}, touched {touched} known')
+        return stats
+
+    def drain(browsers):
+        while True:
+            task = scheduler.get()
+            if task is None:
+                return
+            query, page = task
+            try:
+                stats = run_page(browsers, query, page)
+            except Exception as exc:
+                print(f'{query.label} page {page} failed: {exc}')
+                scheduler.failed(query, page, exc)
+                continue
+            scheduler.done(query, page, stats)
+
+    workers = max(1, args.workers)
+    pool = WorkerPool(workers, lambda index: WorkerBrowsers(index, fingerprints, workers), lambda browsers: browsers.close())
+    for _ in range(pool.workers):
+        pool.submit(drain)
+    started = time.perf_counter()
+    try:
+        pool.start()
+        pool.join()
+    finally:
+        if writer is not None:
+            writer.close()
+            print(writer.summary())
+        db.close()
+        print(db.summary())
+        if job_zhilian.PAGE_CACHE is not None:
+            print(job_zhilian.PAGE_CACHE.summary())
+            job_zhilian.PAGE_CACHE.close()
+        for fingerprint_pool in (job_zhilian.FINGERPRINT_POOL, job.FINGERPRINT_POOL):
+            if fingerprint_pool is not None:
+                fingerprint_pool.close()
+                print(fingerprint_pool.summary())
+        print(limiter.summary())
+        wait_summary = WAIT_STATS.summary()
+        if wait_summary:
+            print(wait_summary)
+        transfer_summary = TRANSFER_STATS.summary(args.block_profile)
+        if transfer_summary:
+            print(transfer_summary)
+
+    print(scheduler.summary())
+    print(
+        f'done in {time.perf_counter() - started:.0f}s: pages={totals["pages"]} '
+        f'saved={totals["saved"]} touched={totals["touched"]}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import itertools
+import queue
+import threading
+
+
+class WorkerPool:
+    def __init__(self, workers, make_driver, close_driver=None):
+        self.workers = max(1, int(workers))
+        self.make_driver = make_driver
+        self.close_driver = close_driver or (lambda driver: driver.quit())
+        self.tasks = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.alive = 0
+        self.started = False
+
+    def submit(self, func, *args, priority=10, **kwargs):
+        # Lower priority runs first; the counter keeps FIFO order within a priority.
+        with self.lock:
+            if self.started and self.alive <= 0:
+                return False
+            self.tasks.put((priority, next(self.counter), func, args, kwargs))
+        return True
+
+    def start(self):
+        with self.lock:
+            self.alive = self.workers
+            self.started = True
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(index,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def wait(self):
+        # Blocks until every submitted task is done; workers stay up for the next batch.
+        self.tasks.join()
+
+    def join(self):
+        self.wait()
+        for _ in self.threads:
+            self.tasks.put((float('inf'), next(self.counter), None, (), {}))
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def _run(self, index):
+        try:
+            driver = self.make_driver(index)
+        except Exception as exc:
+            print(f'worker {index} failed to start: {exc}')
+            self._worker_exit()
+            return
+
+        try:
+            while True:
+                _priority, _seq, func, args, kwargs = self.tasks.get()
+                if func is None:
+                    self.tasks.task_done()
+                    break
+                try:
+                    func(driver, *args, **kwargs)
+                except Exception as exc:
+                    print(f'worker {index} task failed: {exc}')
+                finally:
+                    self.tasks.task_done()
+        finally:
+            try:
+                self.close_driver(driver)
+            except Exception:
+                pass
+            self._worker_exit()
+
+    def _worker_exit(self):
+        with self.lock:
+            self.alive -= 1
+            if self.alive > 0:
+                return
+            # No worker left to consume the queue, drop what is pending so join() returns.
+            while True:
+                try:
+                    self.tasks.get_nowait()
+                except queue.Empty:
+                    break
+                self.tasks.task_done()
@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+# "MySQL server has gone away" / "Lost connection to MySQL server during query" and friends.
+CONNECTION_LOST_CODES = {2006, 2013, 2055, 4031}
+
+
+@dataclass
+class DbConfig:
+    host: str = '127.0.0.1'
+    port: int = 3306
+    user: str = 'root'
+    password: str = 'root'
+    database: str = 'recruitment_system'
+
+    @classmethod
+    def from_env(cls, env=None):
+        env = os.environ if env is None else env
+        defaults = cls()
+        return cls(
+            host=env.get('MYSQL_HOST', defaults.host),
+            port=int(env.get('MYSQL_PORT', defaults.port)),
+            user=env.get('MYSQL_USER', defaults.user),
+            password=env.get('MYSQL_PASSWORD', defaults.password),
+            database=env.get('MYSQL_DATABASE', defaults.database),
+        )
+
+    def connect(self, **kwargs):
+        if pymysql is None:
+            raise RuntimeError('Missing dependency: pymysql. Install via pip install pymysql')
+
+        return pymysql.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            charset='utf8mb4',
+            autocommit=True,
+            **kwargs,
+        )
+
+
+def is_connection_lost(exc):
+    if pymysql is None:
+        return False
+    if isinstance(exc, pymysql.err.InterfaceError):
+        return True
+    return isinstance(exc, pymysql.err.OperationalError) and bool(exc.args) and exc.args[0] in CONNECTION_LOST_CODES
+
+
+class ConnectionPool:
+    # At most `size` connections, opened lazily. A connection idle for longer than ping_interval is
+    # pinged (and reconnected) before it is handed out again.
+    def __init__(self, config, size=4, ping_interval=30, retries=1, connect_kwargs=None):
+        self.config = config
+        self.size = max(1, int(size))
+        self.ping_interval = ping_interval
+        self.retries = retries
+        self.connect_kwargs = connect_kwargs or {}
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.reconnects = 0
+
+    def acquire(self, timeout=None):
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError(f'No free MySQL connection after {timeout}s (pool size {self.size})')
+        try:
+            try:
+                connection, last_used = self.idle.get_nowait()
+            except queue.Empty:
+                connection = self.config.connect(**self.connect_kwargs)
+                with self.lock:
+                    self.opened += 1
+                return connection
+
+            if time.monotonic() - last_used > self.ping_interval:
+                thread_id = connection.thread_id()
+                connection.ping(reconnect=True)
+                if connection.thread_id() != thread_id:
+                    with self.lock:
+                        self.reconnects += 1
+            return connection
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, connection, broken=False):
+        if broken:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        else:
+            self.idle.put((connection, time.monotonic()))
+        self.slots.release()
+
+    def run(self, func, *args, **kwargs):
+        # func(connection, *args) on a pooled connection; a dropped connection is replaced and the
+        # call retried, so only use it for idempotent work (upserts, touches, reads).
+        attempt = 0
+        while True:
+            connection = self.acquire()
+            try:
+                result = func(connection, *args, **kwargs)
+            except Exception as exc:
+                lost = is_connection_lost(exc)
+                self.release(connection, broken=lost)
+                if lost and attempt < self.retries:
+                    attempt += 1
+                    with self.lock:
+                        self.reconnects += 1
+                    print(f'mysql connection lost ({exc}), retry {attempt}/{self.retries}')
+                    continue
+                raise
+            self.release(connection)
+            return result
+
+    def close(self):
+        while True:
+            try:
+                connection, _last_used = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def summary(self):
+        return f'mysql pool {self.config.host}:{self.config.port}/{self.config.database}: opened={self.opened} reconnects={self.reconnects}'
+
+
+def add_db_arguments(parser, legacy=False):
+    # Unset flags fall back to MYSQL_HOST/MYSQL_PORT/MYSQL_USER/MYSQL_PASSWORD/MYSQL_DATABASE, then the defaults.
+    def flags(name, legacy_name):
+        return (f'--db-{name}', f'--{legacy_name}') if legacy else (f'--db-{name}',)
+
+    parser.add_argument(*flags('host', 'host'), dest='db_host', default=None, help='MySQL host')
+    parser.add_argument(*flags('port', 'port'), dest='db_port', type=int, default=None, help='MySQL port')
+    parser.add_argument(*flags('user', 'user'), dest='db_user', default=None, help='MySQL user')
+    parser.add_argument(*flags('password', 'password'), dest='db_password', default=None, help='MySQL password')
+    parser.add_argument(*flags('name', 'database'), dest='db_name', default=None, help='MySQL database')
+    parser.add_argument('--db-pool-size', type=int, default=4, help='Max open MySQL connections')
+
+
+def config_from_args(args):
+    config = DbConfig.from_env()
+    overrides = {
+        'host': args.db_host,
+        'port': args.db_port,
+        'user': args.db_user,
+        'password': args.db_password,
+        'database': args.db_name,
+    }
+    for field, value in overrides.items():
+        if value is not None:
+            setattr(config, field, value)
+    return config
+
+
+def open_pool(args, **connect_kwargs):
+    return ConnectionPool(config_from_args(args), size=args.db_pool_size, connect_kwargs=connect_kwargs)
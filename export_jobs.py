@@ -0,0 +1,215 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from db import add_db_arguments, open_pool
+from job_writer import JOB_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+TABLE_COLUMNS = ('id',) + JOB_COLUMNS + ('status', 'created_at', 'updated_at')
+NUMERIC_COLUMNS = {'salary_min', 'salary_max', 'salary_avg'}
+# Dedup only guards the job.py --export stream against writing a record twice in one run. Table
+# exports skip it: job_url is UNIQUE and stays in the key, so no two table rows can match.
+DEDUP_IGNORED = {'id', 'crawl_date', 'status', 'created_at', 'updated_at'}
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+def detect_format(path):
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith('.' + fmt):
+            return fmt
+    raise ValueError(f'Cannot tell the export format from {path!r}, use .jsonl, .csv or .parquet')
+
+
+def plain_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+class JobExporter:
+    # Writes records as they arrive, so memory stays flat no matter how many rows pass through.
+    # Only an 8-byte digest per distinct row is kept when dedup is on.
+    def __init__(self, path, columns=JOB_COLUMNS, fmt=None, compression=None, dedup=False, row_group_size=50000):
+        self.path = path
+        self.columns = list(columns)
+        self.fmt = fmt or detect_format(path)
+        self.compression = compression
+        if self.compression is None:
+            self.compression = 'gzip' if path.lower().endswith('.gz') else ('snappy' if self.fmt == 'parquet' else 'none')
+        self.dedup_columns = [column for column in self.columns if column not in DEDUP_IGNORED]
+        self.seen = set() if dedup else None
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.duplicates = 0
+        self.pending = []
+        self.stream = None
+        self.csv_writer = None
+        self.parquet_writer = None
+
+        if self.fmt == 'parquet':
+            if pa is None:
+                raise RuntimeError('Missing dependency: pyarrow. Install via pip install pyarrow')
+            fields = []
+            for column in self.columns:
+                if column == 'id':
+                    fields.append(pa.field(column, pa.int64()))
+                elif column in NUMERIC_COLUMNS:
+                    fields.append(pa.field(column, pa.float64()))
+                else:
+                    fields.append(pa.field(column, pa.string()))
+            self.schema = pa.schema(fields)
+            codec = None if self.compression == 'none' else self.compression
+            self.parquet_writer = pq.ParquetWriter(path, self.schema, compression=codec)
+        else:
+            if self.compression == 'gzip':
+                self.stream = io.TextIOWrapper(gzip.open(path, 'wb'), encoding='utf-8', newline='')
+            elif self.compression == 'none':
+                self.stream = open(path, 'w', encoding='utf-8', newline='')
+            else:
+                raise ValueError(f'{self.fmt} export supports gzip or none compression, not {self.compression!r}')
+            if self.fmt == 'csv':
+                # BOM so Excel opens the Chinese columns correctly.
+                if self.compression == 'none':
+                    self.stream.write('\ufeff')
+                self.csv_writer = csv.writer(self.stream)
+                self.csv_writer.writerow(self.columns)
+
+    def _is_duplicate(self, row):
+        if self.seen is None:
+            return False
+        payload = json.dumps([row[column] for column in self.dedup_columns], ensure_ascii=False, default=str)
+        key = int.from_bytes(hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest(), 'big')
+        if key in self.seen:
+            self.duplicates += 1
+            return True
+        self.seen.add(key)
+        return False
+
+    def write(self, records):
+        for item in records:
+            row = {column: plain_value(item.get(column)) for column in self.columns}
+            if self._is_duplicate(row):
+                continue
+            self.rows += 1
+            if self.fmt == 'jsonl':
+                self.stream.write(json.dumps(row, ensure_ascii=False))
+                self.stream.write('\n')
+            elif self.fmt == 'csv':
+                self.csv_writer.writerow(['' if row[column] is None else row[column] for column in self.columns])
+            else:
+                self.pending.append(row)
+                if len(self.pending) >= self.row_group_size:
+                    self._write_row_group()
+
+    def _write_row_group(self):
+        if not self.pending:
+            return
+        arrays = {}
+        for column in self.columns:
+            values = [row[column] for row in self.pending]
+            if column not in NUMERIC_COLUMNS and column != 'id':
+                values = [None if value is None else str(value) for value in values]
+            arrays[column] = values
+        self.parquet_writer.write_table(pa.Table.from_pydict(arrays, schema=self.schema))
+        self.pending = []
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self._write_row_group()
+            self.parquet_writer.close()
+            self.parquet_writer = None
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def summary(self):
+        return f'export {self.path} [{self.fmt}, {self.compression}]: rows={self.rows} duplicates={self.duplicates}'
+
+
+def load_job_chunk(connection, after_id, chunk_size=5000, source=None, since=None):
+    sql = f"SELECT {', '.join(TABLE_COLUMNS)} FROM jobs WHERE id > %s"
+    params = [after_id]
+    if source:
+        sql += ' AND source=%s'
+        params.append(source)
+    if since:
+        sql += ' AND crawl_date >= %s'
+        params.append(since)
+    sql += ' ORDER BY id ASC LIMIT %s'
+    params.append(chunk_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [dict(zip(TABLE_COLUMNS, row)) for row in cursor.fetchall()]
+
+
+def iter_job_chunks(db, chunk_size=5000, source=None, since=None):
+    # One pooled query per keyset page, so a dropped connection only repeats the current page.
+    last_id = 0
+    while True:
+        chunk = db.run(load_job_chunk, last_id, chunk_size=chunk_size, source=source, since=since)
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+def export_table(db, exporter, chunk_size=5000, source=None, since=None):
+    for chunk in iter_job_chunks(db, chunk_size=chunk_size, source=source, since=since):
+        exporter.write(chunk)
+        print(f'exported {exporter.rows} rows, last id={chunk[-1]["id"]}')
+    return exporter.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream the jobs table to JSONL, CSV or Parquet')
+    parser.add_argument('output', help='Output path; the format comes from the extension, e.g. jobs.jsonl.gz, jobs.csv, jobs.parquet')
+    parser.add_argument('--format', choices=FORMATS, default=None, help='Override the format detected from the extension')
+    parser.add_argument(
+        '--compression',
+        choices=['none', 'gzip', 'snappy', 'zstd'],
+        default=None,
+        help='Default: gzip for *.gz, snappy for parquet, none otherwise (snappy/zstd are parquet only)',
+    )
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Rows read per keyset page')
+    parser.add_argument('--source', default='', help='Only export this source, e.g. zhilian or liepin')
+    parser.add_argument('--since', default='', help='Only export rows crawled at or after this date, e.g. 2024-01-01')
+    add_db_arguments(parser)
+    args = parser.parse_args()
+
+    db = open_pool(args)
+    exporter = JobExporter(
+        args.output,
+        columns=TABLE_COLUMNS,
+        fmt=args.format,
+        compression=args.compression,
+    )
+    started = time.perf_counter()
+    try:
+        export_table(db, exporter, chunk_size=args.chunk_size, source=args.source, since=args.since)
+    finally:
+        exporter.close()
+        db.close()
+    print(f'{exporter.summary()} in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
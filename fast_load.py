@@ -0,0 +1,133 @@
+import threading
+import time
+
+IMAGE_PATTERNS = ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*']
+MEDIA_PATTERNS = ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*']
+FONT_PATTERNS = ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*']
+CSS_PATTERNS = ['*.css*']
+# Analytics, ads and chat widgets; captcha hosts are deliberately left alone.
+THIRD_PARTY_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*hm.baidu.com*',
+    '*cnzz.com*',
+    '*51.la*',
+    '*growingio.com*',
+    '*sensorsdata.cn*',
+    '*zhugeio.com*',
+    '*tingyun.com*',
+    '*mediav.com*',
+    '*qiyukf.com*',
+]
+
+BLOCK_PROFILES = {
+    'off': {'images': False, 'eager': False, 'patterns': []},
+    'lite': {
+        'images': True,
+        'eager': True,
+        'patterns': IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS + THIRD_PARTY_PATTERNS,
+    },
+    'strict': {
+        'images': True,
+        'eager': True,
+        'patterns': IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS + THIRD_PARTY_PATTERNS + CSS_PATTERNS,
+    },
+}
+
+TRANSFER_JS = '''
+var total = 0, count = 0;
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav) { total += nav.transferSize || 0; count += 1; }
+performance.getEntriesByType('resource').forEach(function (entry) {
+    total += entry.transferSize || 0;
+    count += 1;
+});
+return [total, count];
+'''
+BASELINE_WAIT = 15
+
+
+def configure_options(chrome_options, profile, attached=False):
+    settings = BLOCK_PROFILES[profile]
+    # Prefs only apply when chromedriver launches Chrome; an attached browser relies on the CDP blocking.
+    if settings['images'] and not attached:
+        # Images are not downloaded, but <img src> attributes stay in the DOM for logo extraction.
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    if settings['eager']:
+        chrome_options.page_load_strategy = 'eager'
+
+
+def apply_block_profile(driver, profile):
+    patterns = BLOCK_PROFILES[profile]['patterns']
+    driver.block_profile = profile
+    if not patterns:
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def measure_unblocked(driver, url):
+    # URL blocking is per tab, so a fresh tab loads the page in full while the crawled one is left as
+    # it is. Images turned off by the Chrome pref stay off here too.
+    original = driver.current_window_handle
+    driver.switch_to.new_window('tab')
+    try:
+        driver.get(url)
+        deadline = time.monotonic() + BASELINE_WAIT
+        while driver.execute_script('return document.readyState') != 'complete' and time.monotonic() < deadline:
+            time.sleep(0.2)
+        total, count = driver.execute_script(TRANSFER_JS)
+    finally:
+        driver.close()
+        driver.switch_to.window(original)
+    return int(total or 0), int(count or 0)
+
+
+class TransferStats:
+    # The first page of each label is loaded once more without the block list, so the summary can
+    # show bytes saved per page instead of needing a second run with --block-profile off.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+        self.baselines = {}
+
+    def record(self, driver, label):
+        try:
+            total, count = driver.execute_script(TRANSFER_JS)
+        except Exception:
+            return
+        with self.lock:
+            item = self.items.setdefault(label, {'pages': 0, 'bytes': 0, 'requests': 0})
+            item['pages'] += 1
+            item['bytes'] += int(total or 0)
+            item['requests'] += int(count or 0)
+            blocking = BLOCK_PROFILES[getattr(driver, 'block_profile', 'off')]['patterns']
+            if not blocking or label in self.baselines:
+                return
+            self.baselines[label] = None
+        try:
+            baseline = measure_unblocked(driver, driver.current_url)
+        except Exception:
+            return
+        with self.lock:
+            self.baselines[label] = baseline
+
+    def summary(self, profile):
+        with self.lock:
+            lines = []
+            for label, item in sorted(self.items.items()):
+                pages = item['pages'] or 1
+                line = (
+                    f"transfer {label} [{profile}]: pages={item['pages']} "
+                    f"avg={item['bytes'] / pages / 1024:.1f}KB avg_requests={item['requests'] / pages:.1f}"
+                )
+                baseline = self.baselines.get(label)
+                if baseline is not None:
+                    saved = baseline[0] - item['bytes'] / pages
+                    line += f" unblocked={baseline[0] / 1024:.1f}KB saved={saved / 1024:.1f}KB/page"
+                lines.append(line)
+            return '\n'.join(lines)
+
+
+STATS = TransferStats()
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from browser_profiles import cookie_digest
+from checkpoint import file_lock
+
+DEFAULT_POOL_FILE = '.fingerprints.json'
+# Same names as the jobs.source column and the crawl spec.
+SITES = ('zhilian', 'liepin')
+DEFAULT_COOLDOWN = 300
+MAX_COOLDOWN = 3600
+# Health is an exponentially weighted success rate, so a session that starts failing drops fast
+# while one bad page on an otherwise clean identity does not bench it.
+HEALTH_DECAY = 0.8
+SAVE_EVERY = 20
+
+
+class FingerprintPool:
+    # Several cookie/UA/XSRF identities per site with their own success and captcha counts.
+    # Each worker keeps its identity until that identity hits a security page; it then cools down
+    # (doubling per consecutive block) and the worker moves to the healthiest free identity.
+    # crawl.py opens one pool per site on the same file and `add` may run mid-crawl, so every save
+    # re-reads the file under a lock and only writes back what this process changed.
+    def __init__(self, path=DEFAULT_POOL_FILE, site=None, cooldown=DEFAULT_COOLDOWN, max_cooldown=MAX_COOLDOWN):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.site = site
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.assigned = {}
+        self.unsaved = 0
+        self.rotations = 0
+        self.touched = set()
+        with file_lock(self.lock_path):
+            self.data = self._load()
+
+    def _load(self):
+        data = {'identities': [], 'stats': {}}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            data['identities'] = loaded.get('identities', [])
+            data['stats'] = loaded.get('stats', {})
+        return data
+
+    def identities(self):
+        return [item for item in self.data['identities'] if self.site is None or item['site'] == self.site]
+
+    def __len__(self):
+        return len(self.identities())
+
+    def _stats(self, identity_id):
+        return self.data['stats'].setdefault(
+            identity_id,
+            {'success': 0, 'blocked': 0, 'streak': 0, 'health': 1.0, 'cooldown_until': 0, 'last_used': 0},
+        )
+
+    def add(self, site, user_agent, cookie, xsrf_token=''):
+        if site not in SITES:
+            raise ValueError(f'Unknown site {site!r}, expected one of {", ".join(SITES)}')
+        # add and remove edit the file as it is now, under the lock, rather than this process's copy.
+        with self.lock, file_lock(self.lock_path):
+            self._merge()
+            digest = cookie_digest(cookie)
+            for item in self.data['identities']:
+                if item['site'] == site and cookie_digest(item['cookie']) == digest:
+                    item.update(user_agent=user_agent, xsrf_token=xsrf_token)
+                    self._write()
+                    return item['id']
+            used = {item['id'] for item in self.data['identities']}
+            number = 1
+            while f'{site}-{number}' in used:
+                number += 1
+            identity = {
+                'id': f'{site}-{number}',
+                'site': site,
+                'user_agent': user_agent,
+                'cookie': cookie,
+                'xsrf_token': xsrf_token,
+                'added_at': time.time(),
+            }
+            self.data['identities'].append(identity)
+            self._write()
+            return identity['id']
+
+    def remove(self, identity_id):
+        with self.lock, file_lock(self.lock_path):
+            self._merge()
+            before = len(self.data['identities'])
+            self.data['identities'] = [item for item in self.data['identities'] if item['id'] != identity_id]
+            self.data['stats'].pop(identity_id, None)
+            self._write()
+            return len(self.data['identities']) < before
+
+    def acquire(self, worker=0):
+        # Affinity first: a worker keeps its identity while it is not cooling down.
+        with self.lock:
+            identities = self.identities()
+            if not identities:
+                return None
+            now = time.time()
+            current = self.assigned.get(worker)
+            by_id = {item['id']: item for item in identities}
+            if current in by_id and self._stats(current)['cooldown_until'] <= now:
+                return self._lease(worker, by_id[current], now)
+
+            taken = {identity_id for other, identity_id in self.assigned.items() if other != worker}
+            ready = [item for item in identities if self._stats(item['id'])['cooldown_until'] <= now]
+            candidates = [item for item in ready if item['id'] not in taken] or ready
+            if candidates:
+                best = max(candidates, key=lambda item: (self._stats(item['id'])['health'], -self._stats(item['id'])['last_used']))
+            else:
+                # Everything is cooling down: hand out the one that recovers first, the caller waits for it.
+                best = min(identities, key=lambda item: self._stats(item['id'])['cooldown_until'])
+            if current is not None and best['id'] != current:
+                self.rotations += 1
+            return self._lease(worker, best, now)
+
+    def _lease(self, worker, identity, now):
+        self.assigned[worker] = identity['id']
+        self._stats(identity['id'])['last_used'] = now
+        self.touched.add(identity['id'])
+        return {
+            'id': identity['id'],
+            'user_agent': identity.get('user_agent', ''),
+            'cookie': identity.get('cookie', ''),
+            'xsrf_token': identity.get('xsrf_token', ''),
+        }
+
+    def cooldown_remaining(self, identity_id):
+        with self.lock:
+            return max(0.0, self._stats(identity_id)['cooldown_until'] - time.time())
+
+    def report(self, identity_id, blocked):
+        if identity_id is None:
+            return
+        with self.lock:
+            stats = self._stats(identity_id)
+            self.touched.add(identity_id)
+            stats['health'] = stats['health'] * HEALTH_DECAY + (0.0 if blocked else 1.0) * (1 - HEALTH_DECAY)
+            if blocked:
+                stats['blocked'] += 1
+                stats['streak'] += 1
+                delay = min(self.max_cooldown, self.cooldown * 2 ** (stats['streak'] - 1))
+                stats['cooldown_until'] = time.time() + delay
+                self._save()
+                return
+            stats['success'] += 1
+            stats['streak'] = 0
+            self.unsaved += 1
+            if self.unsaved >= SAVE_EVERY:
+                self._save()
+
+    def close(self):
+        with self.lock:
+            self._save()
+
+    def summary(self):
+        with self.lock:
+            parts = []
+            for item in self.identities():
+                stats = self._stats(item['id'])
+                total = stats['success'] + stats['blocked']
+                rate = stats['blocked'] / total if total else 0.0
+                parts.append(f"{item['id']} ok={stats['success']} captcha={stats['blocked']} ({rate:.0%}) health={stats['health']:.2f}")
+            return f'fingerprint pool: rotations={self.rotations}; ' + '; '.join(parts)
+
+    def _merge(self):
+        # Caller holds the file lock. Identities and the stats of identities this process did not use
+        # come from disk, so adds, removes and the other site's pool since the last save survive.
+        merged = self._load()
+        known = {item['id'] for item in merged['identities']}
+        for identity_id in self.touched & known:
+            if identity_id in self.data['stats']:
+                merged['stats'][identity_id] = self.data['stats'][identity_id]
+        self.data = merged
+        self.touched.clear()
+
+    def _write(self):
+        self.unsaved = 0
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _save(self):
+        with file_lock(self.lock_path):
+            self._merge()
+            self._write()
+
+
+def add_fingerprint_pool_arguments(parser):
+    parser.add_argument(
+        '--fingerprint-pool',
+        nargs='?',
+        const=DEFAULT_POOL_FILE,
+        default='',
+        help='Rotate identities from this pool file instead of the single fingerprint (one identity per worker)',
+    )
+    parser.add_argument('--identity-cooldown', type=float, default=DEFAULT_COOLDOWN, help='Seconds an identity rests after a security page, doubled per repeat')
+
+
+def open_fingerprint_pool(args, site):
+    if not args.fingerprint_pool:
+        return None
+    pool = FingerprintPool(args.fingerprint_pool, site=site, cooldown=args.identity_cooldown)
+    if not len(pool):
+        print(f'fingerprint pool {args.fingerprint_pool} has no {site} identities, using the single fingerprint')
+        return None
+    return pool
+
+
+def read_env(env_path):
+    data = {}
+    if not os.path.exists(env_path):
+        return data
+    with open(env_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            data[key.strip()] = value.strip().strip('"\'')
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or edit the fingerprint pool')
+    parser.add_argument('--pool', default=DEFAULT_POOL_FILE, help='Pool file path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='Show identities with their success/captcha counts')
+    add_parser = sub.add_parser('add', help='Add an identity; missing values come from ZHILIAN_*/LIEPIN_* in --env')
+    add_parser.add_argument('site', choices=SITES)
+    add_parser.add_argument('--user-agent', default='')
+    add_parser.add_argument('--cookie', default='')
+    add_parser.add_argument('--xsrf-token', default='')
+    add_parser.add_argument('--env', default='.env', help='Env file written by generate_fingerprint.py')
+    remove_parser = sub.add_parser('remove', help='Drop an identity, e.g. after its account was banned')
+    remove_parser.add_argument('identity')
+    args = parser.parse_args()
+
+    pool = FingerprintPool(args.pool)
+    if args.command == 'remove':
+        print('removed' if pool.remove(args.identity) else f'no identity {args.identity}')
+        return
+    if args.command == 'add':
+        env_data = read_env(args.env)
+        prefix = args.site.upper()
+        cookie = args.cookie or env_data.get(f'{prefix}_COOKIE', '')
+        if not cookie:
+            parser.error(f'no cookie: pass --cookie or set {prefix}_COOKIE in {args.env}')
+        identity = pool.add(
+            args.site,
+            args.user_agent or env_data.get(f'{prefix}_USER_AGENT', ''),
+            cookie,
+            args.xsrf_token or env_data.get(f'{prefix}_XSRF_TOKEN', ''),
+        )
+        print(f'added {identity}')
+        return
+
+    now = time.time()
+    for item in pool.identities():
+        stats = pool._stats(item['id'])
+        resting = max(0, stats['cooldown_until'] - now)
+        state = f'cooling down {resting:.0f}s' if resting else 'ready'
+        print(
+            f"{item['id']}: ok={stats['success']} captcha={stats['blocked']} health={stats['health']:.2f} "
+            f"{state}, ua={item.get('user_agent', '')[:60]}"
+        )
+
+
+if __name__ == '__main__':
+    main()
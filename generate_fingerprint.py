@@ -5,8 +5,11 @@ import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
+from browser_profiles import add_browser_arguments, open_browser_sessions
+from fingerprint_pool import DEFAULT_POOL_FILE, FingerprintPool
 
-def build_driver(headless):
+
+def build_driver(headless, sessions=None):
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--disable-gpu')
@@ -14,7 +17,15 @@ def build_driver(headless):
     chrome_options.add_argument('--disable-dev-shm-usage')
     if headless:
         chrome_options.add_argument('--headless=new')
-    return webdriver.Chrome(options=chrome_options)
+    browser_session = sessions.configure(chrome_options) if sessions is not None else None
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+    except Exception:
+        if sessions is not None:
+            sessions.release(browser_session)
+        raise
+    driver.browser_session = browser_session
+    return driver
 
 
 def write_legacy_fingerprint(output_path, user_agent, cookies, xsrf_token):
@@ -72,9 +83,19 @@ def main():
     parser.add_argument('--no-legacy', action='store_true', help='Do not write legacy 1.txt format')
     parser.add_argument('--headless', action='store_true', help='Run Chrome headless')
     parser.add_argument('--wait', type=int, default=5, help='Seconds to wait for page load')
+    parser.add_argument(
+        '--pool',
+        nargs='?',
+        const=DEFAULT_POOL_FILE,
+        default='',
+        help='Also add this identity to a fingerprint pool file instead of only replacing the single one',
+    )
+    add_browser_arguments(parser)
     args = parser.parse_args()
 
-    driver = build_driver(args.headless)
+    # With --profile-dir the login stays in the profile, and the crawlers reuse it without re-injecting cookies.
+    sessions = open_browser_sessions(args)
+    driver = build_driver(args.headless, sessions)
     try:
         driver.get('https://www.liepin.com/')
         time.sleep(args.wait)
@@ -90,8 +111,12 @@ def main():
             if item.get('name') == 'XSRF-TOKEN':
                 xsrf_token = item.get('value', '')
                 break
+        if sessions is not None:
+            sessions.mark_warm(driver.browser_session, 'liepin', cookie_string)
     finally:
         driver.quit()
+        if sessions is not None:
+            sessions.release(driver.browser_session)
 
     env_data = load_env(args.env)
     env_data['LIEPIN_USER_AGENT'] = user_agent
@@ -102,6 +127,10 @@ def main():
     if not args.no_legacy:
         write_legacy_fingerprint(args.output, user_agent, cookie_string, xsrf_token)
 
+    if args.pool:
+        identity = FingerprintPool(args.pool).add('liepin', user_agent, cookie_string, xsrf_token)
+        print(f'Added {identity} to fingerprint pool {args.pool}')
+
     print(f'Liepin fingerprint saved to {args.env}')
     if not args.no_legacy:
         print(f'Legacy fingerprint also saved to {args.output}')
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+
+
+def url_key(job_url):
+    # 8-byte digests keep a few hundred thousand known URLs in a handful of MB.
+    return hashlib.blake2b(job_url.encode('utf-8'), digest_size=8).digest()
+
+
+class KnownUrls:
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+        self.pending_touch = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def check(self, job_url):
+        # Known jobs are queued for a crawl_date/status touch instead of a full re-crawl.
+        key = url_key(job_url)
+        with self.lock:
+            if key not in self.keys:
+                return False
+            self.pending_touch.append(job_url)
+            return True
+
+    def take(self):
+        # Taken outside db.run, so a retry after a dropped connection touches the same URLs again.
+        with self.lock:
+            job_urls, self.pending_touch = self.pending_touch, []
+        return job_urls
+
+
+def load_known_urls(connection, source, chunk_size=50000):
+    sql = 'SELECT id, job_url FROM jobs WHERE source=%s AND id > %s ORDER BY id ASC LIMIT %s'
+    keys = set()
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(sql, (source, last_id, chunk_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for _id, job_url in rows:
+                keys.add(url_key(job_url))
+            last_id = rows[-1][0]
+    return KnownUrls(keys)
+
+
+def touch_jobs(connection, job_urls, chunk_size=500):
+    if not job_urls:
+        return 0
+
+    touched = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(job_urls), chunk_size):
+            chunk = job_urls[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            sql = (
+                "UPDATE jobs SET crawl_date=CURRENT_TIMESTAMP, status='active', updated_at=updated_at "
+                f"WHERE job_url IN ({placeholders})"
+            )
+            touched += cursor.execute(sql, chunk)
+    return touched
@@ -24,6 +24,7 @@ CREATE TABLE jobs (
   skills TEXT NOT NULL,
   source VARCHAR(50) NOT NULL,
   company_logo VARCHAR(255) NOT NULL,
+  content_hash CHAR(32) NOT NULL DEFAULT '',
   crawl_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   status VARCHAR(20) NOT NULL DEFAULT 'active',
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -1,24 +1,47 @@
 ﻿from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-import pandas as pd
 import json
 import time
 import base64
 import re
 import os
 from datetime import datetime
+from functools import partial
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 import argparse
 
-try:
-    import pymysql
-except ImportError:
-    pymysql = None
+from browser_profiles import add_browser_arguments, open_browser_sessions
+from cdp_capture import NetworkCapture
+from checkpoint import CheckpointStore, add_checkpoint_arguments
+from db import DbConfig, add_db_arguments, open_pool
+from export_jobs import JobExporter
+from fast_load import BLOCK_PROFILES, STATS as TRANSFER_STATS, apply_block_profile, configure_options
+from fingerprint_pool import add_fingerprint_pool_arguments, open_fingerprint_pool
+from incremental import load_known_urls, touch_jobs
+from job_writer import add_writer_arguments, open_writer, upsert_jobs, writer_connect_kwargs
+from liepin_api import SEARCH_API, apply_fingerprint, create_session, search_jobs
+from pagination import add_pagination_arguments, find_totals, open_paginator, page_stats
+from rate_limit import add_rate_arguments, open_rate_limiter
+from readiness import STATS as WAIT_STATS, wait_for_response, wait_until
+from salary import parse_salary
 
 CHROME_BINARY = None
 HEADLESS = False
 FINGERPRINT_FILE = '.env'
 USE_FINGERPRINT = False
+BROWSER_SESSIONS = None
+FINGERPRINT_POOL = None
+RATE_LIMITER = None
+JOB_WRITER = None
+NETWORK_CAPTURE = 'cdp'
+BLOCK_PROFILE = 'lite'
+
+STATIC_JS = 'concat.lietou-static.com/fe-www-pc/v6/js'
+# Upper bound only: get_data returns as soon as the search API response has finished loading.
+PAGE_WAIT = 10
+# build_search_url(..., city=) replaces the default city code in place.
+LIEPIN_SEARCH_URL = 'https://www.liepin.com/zhaopin/?city=410&currentPage=0&pageSize=40'
+LIEPIN_PAGE_SIZE = 40
 
 def load_env_file(env_path='.env'):
     data = {}
@@ -108,7 +131,7 @@ def update_fingerprint_from_browser(file_path):
     driver.quit()
 
 
-def apply_cookies(driver, cookie_string):
+def apply_cookies(driver, cookie_string, expiry=None):
     if not cookie_string:
         return
     cookies = [c.strip() for c in cookie_string.split(';') if c.strip()]
@@ -116,14 +139,18 @@ def apply_cookies(driver, cookie_string):
         if '=' not in cookie:
             continue
         name, value = cookie.split('=', 1)
-        driver.add_cookie({
+        item = {
             'name': name.strip(),
             'value': value.strip(),
             'domain': '.liepin.com',
-        })
+        }
+        if expiry:
+            # Without an expiry Chrome drops it on exit instead of keeping it in the profile.
+            item['expiry'] = int(expiry)
+        driver.add_cookie(item)
 
 
-def create_driver(fingerprint):
+def create_driver(fingerprint, index=0):
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--disable-gpu')
@@ -134,14 +161,28 @@ def create_driver(fingerprint):
     if CHROME_BINARY:
         chrome_options.binary_location = CHROME_BINARY
 
+    browser_session = BROWSER_SESSIONS.configure(chrome_options, index) if BROWSER_SESSIONS is not None else None
+    attached = BROWSER_SESSIONS is not None and bool(BROWSER_SESSIONS.attach)
+
     if USE_FINGERPRINT and fingerprint.get('user_agent'):
         chrome_options.add_argument(f"--user-agent={fingerprint['user_agent']}")
+    configure_options(chrome_options, BLOCK_PROFILE, attached)
 
-    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if NETWORK_CAPTURE == 'log':
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
-    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+    except Exception:
+        if BROWSER_SESSIONS is not None:
+            BROWSER_SESSIONS.release(browser_session)
+        raise
+    driver.browser_session = browser_session
     driver.implicitly_wait(8)
     driver.execute_cdp_cmd('Network.enable', {})
+    if attached and USE_FINGERPRINT and fingerprint.get('user_agent'):
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': fingerprint['user_agent']})
+    apply_block_profile(driver, BLOCK_PROFILE)
 
     extra_headers = {}
     if USE_FINGERPRINT and fingerprint.get('xsrf_token'):
@@ -152,6 +193,15 @@ def create_driver(fingerprint):
     return driver
 
 
+def create_capture(driver):
+    # Bodies only for the search API; the static JS bundle is watched for its status code alone.
+    return NetworkCapture(
+        driver,
+        body_patterns=[(SEARCH_API + '*', None)],
+        status_patterns=[(f'*{STATIC_JS}*', 'Script')],
+    ).start()
+
+
 def safe_get(obj, *keys):
     for key in keys:
         if not isinstance(obj, dict) or key not in obj:
@@ -197,46 +247,6 @@ def normalize_text(value):
     return str(value).strip()
 
 
-def parse_salary(salary_text):
-    if not salary_text:
-        return None, None, None
-    text = str(salary_text).replace(' ', '')
-    if '面议' in text:
-        return None, None, None
-    if '·' in text:
-        text = text.split('·', 1)[0]
-
-    is_year = '年' in text
-    unit = None
-    if '万' in text:
-        unit = 'wan'
-    elif '千' in text:
-        unit = 'qian'
-    elif re.search(r"[kK]", text):
-        unit = 'k'
-
-    numbers = re.findall(r"\d+(?:\.\d+)?", text)
-    if not numbers:
-        return None, None, None
-
-    min_value = float(numbers[0])
-    max_value = float(numbers[1]) if len(numbers) > 1 else min_value
-
-    if unit == 'wan':
-        min_value *= 10
-        max_value *= 10
-    elif unit == 'qian':
-        min_value *= 1
-        max_value *= 1
-
-    if is_year:
-        min_value /= 12
-        max_value /= 12
-
-    avg_value = (min_value + max_value) / 2
-    return round(min_value, 2), round(max_value, 2), round(avg_value, 2)
-
-
 def build_job_url(job_item):
     job = job_item.get('job', {}) if isinstance(job_item, dict) else {}
     job_url = pick_value(job, ['jobUrl', 'jobLink', 'link', 'detailUrl'])
@@ -300,30 +310,17 @@ def extract_job_item(job_item):
     }
 
 
-def get_data(driver, url, seen_urls):
-    try:
-        driver.get_log('performance')
-    except Exception:
-        pass
-
-    driver.get(url)
-    time.sleep(3)
-
-    page_records = []
-
-    logs = [json.loads(log['message'])['message'] for log in driver.get_log('performance')]
+def read_performance_bodies(driver, logs):
+    bodies = []
     static_js_403 = False
     for log in logs:
         if log.get('method') != 'Network.responseReceived':
             continue
         response = log.get('params', {}).get('response', {})
         response_url = response.get('url', '')
-        if (
-            response.get('status') == 403
-            and 'concat.lietou-static.com/fe-www-pc/v6/js' in response_url
-        ):
+        if response.get('status') == 403 and STATIC_JS in response_url:
             static_js_403 = True
-        if 'https://api-c.liepin.com/api/com.liepin.searchfront4c.pc-search-job' not in response_url:
+        if SEARCH_API not in response_url:
             continue
 
         request_id = log.get('params', {}).get('requestId')
@@ -335,91 +332,193 @@ def get_data(driver, url, seen_urls):
             body = response_dict.get('body', '')
             if response_dict.get('base64Encoded'):
                 body = base64.b64decode(body).decode('utf-8', errors='ignore')
+        except Exception:
+            continue
+        bodies.append(body)
+
+    return bodies, static_js_403
+
+
+def get_data(driver, url, seen_urls, page_wait=PAGE_WAIT, known_urls=None, capture=None, stats=None):
+    if RATE_LIMITER is not None:
+        RATE_LIMITER.wait(url)
+    if capture is not None:
+        capture.clear()
+        driver.get(url)
+        wait_until(lambda: capture.has_body(SEARCH_API), page_wait, label='liepin_search')
+        responses = capture.responses()
+        bodies = [item.body for item in responses if item.body and SEARCH_API in item.url]
+        static_js_403 = any(item.status == 403 and STATIC_JS in item.url for item in responses)
+    else:
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
+
+        driver.get(url)
+        logs = wait_for_response(driver, SEARCH_API, page_wait, label='liepin_search')
+        bodies, static_js_403 = read_performance_bodies(driver, logs)
+    TRANSFER_STATS.record(driver, 'liepin_search')
+
+    page_records = []
+    cards = 0
+    for body in bodies:
+        try:
             body_dict = json.loads(body)
         except Exception:
             continue
 
         job_card_list = safe_get(body_dict, 'data', 'data', 'jobCardList') or []
-        for item in job_card_list:
-            job_data = extract_job_item(item)
-            job_url = job_data.get('job_url')
-            if not job_url:
-                continue
-            if job_url in seen_urls:
-                continue
-            seen_urls.add(job_url)
-            print(job_data)
-            page_records.append(job_data)
+        cards += len(job_card_list)
+        page_records.extend(collect_job_cards(job_card_list, seen_urls, known_urls, stats))
+        read_totals(body_dict, stats)
 
     if not page_records and static_js_403:
         print('Detected 403 on Liepin JS assets. Disable fingerprint/cookie injection and retry.')
+        report_outcome(driver, url, 'blocked')
+        if stats is not None:
+            stats['blocked'] = True
+    else:
+        report_outcome(driver, url, 'ok' if cards else 'empty')
 
     return page_records
 
 
-def get_db_connection():
-    if pymysql is None:
-        raise RuntimeError('Missing dependency: pymysql. Install via pip install pymysql')
+def rotate_identity(driver):
+    # The identity just got the 403: swap in the next one before --retry-empty tries again.
+    identity = FINGERPRINT_POOL.acquire(getattr(driver, 'worker_index', 0))
+    wait = FINGERPRINT_POOL.cooldown_remaining(identity['id'])
+    if wait:
+        print(f'all identities cooling down, waiting {wait:.0f}s for {identity["id"]}')
+        time.sleep(wait)
+    if identity['id'] == driver.identity:
+        return
+    print(f'rotating identity {driver.identity} -> {identity["id"]}')
+    driver.identity = identity['id']
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        # --engine http: a requests session, only its headers change.
+        apply_fingerprint(driver, identity)
+        return
+    if identity.get('user_agent'):
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': identity['user_agent']})
+    if identity.get('xsrf_token'):
+        driver.execute_cdp_cmd('Network.setExtraHTTPHeaders', {'headers': {'x-xsrf-token': identity['xsrf_token']}})
+    driver.delete_all_cookies()
+    driver.get('https://www.liepin.com/')
+    apply_cookies(driver, identity.get('cookie'))
 
-    return pymysql.connect(
-        host='127.0.0.1',
-        port=3306,
-        user='root',
-        password='root',
-        database='recruitment_system',
-        charset='utf8mb4',
-        autocommit=True,
-    )
 
+def report_identity(driver, blocked):
+    identity = getattr(driver, 'identity', None)
+    if FINGERPRINT_POOL is None or identity is None:
+        return
+    FINGERPRINT_POOL.report(identity, blocked)
+    if blocked:
+        rotate_identity(driver)
+
+
+def report_outcome(driver, url, outcome):
+    # outcome: 'ok', 'empty' (empty jobCardList) or 'blocked' (403 on the static JS / failed API call).
+    if RATE_LIMITER is not None:
+        if outcome == 'blocked':
+            RATE_LIMITER.blocked(url)
+        elif outcome == 'empty':
+            RATE_LIMITER.empty(url)
+        else:
+            RATE_LIMITER.success(url)
+    if outcome != 'empty':
+        report_identity(driver, outcome == 'blocked')
+
+
+def read_totals(body_dict, stats):
+    # The result size sits next to jobCardList, in data.pagination (totalCounts/totalPage).
+    if stats is None:
+        return
+    total, total_pages = find_totals(safe_get(body_dict, 'data'))
+    if total is not None:
+        stats['total'] = total
+    if total_pages is not None:
+        stats['total_pages'] = total_pages
 
-def save_to_mysql(connection, records):
-    if not records:
-        return 0
-
-    sql = (
-        "INSERT INTO jobs (title, company, salary, salary_min, salary_max, salary_avg, "
-        "location, experience, education, industry, job_type, company_nature, company_size, "
-        "job_url, skills, source, company_logo, crawl_date) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
-        "ON DUPLICATE KEY UPDATE "
-        "title=VALUES(title), company=VALUES(company), salary=VALUES(salary), "
-        "salary_min=VALUES(salary_min), salary_max=VALUES(salary_max), salary_avg=VALUES(salary_avg), "
-        "location=VALUES(location), experience=VALUES(experience), education=VALUES(education), "
-        "industry=VALUES(industry), job_type=VALUES(job_type), company_nature=VALUES(company_nature), "
-        "company_size=VALUES(company_size), skills=VALUES(skills), source=VALUES(source), "
-        "company_logo=VALUES(company_logo), crawl_date=VALUES(crawl_date), "
-        "updated_at=CURRENT_TIMESTAMP"
-    )
 
-    values = []
-    for item in records:
-        values.append((
-            item['title'],
-            item['company'],
-            item['salary'],
-            item['salary_min'],
-            item['salary_max'],
-            item['salary_avg'],
-            item['location'],
-            item['experience'],
-            item['education'],
-            item['industry'],
-            item['job_type'],
-            item['company_nature'],
-            item['company_size'],
-            item['job_url'],
-            item['skills'],
-            item['source'],
-            item['company_logo'],
-            item['crawl_date'],
-        ))
-
-    with connection.cursor() as cursor:
-        cursor.executemany(sql, values)
-    return len(values)
-
-
-def build_search_url(base_url, current_page, page_size=None, key=None):
+def collect_job_cards(job_card_list, seen_urls, known_urls=None, stats=None):
+    page_records = []
+    if stats is not None:
+        stats['listed'] += len(job_card_list)
+    for item in job_card_list:
+        job_data = extract_job_item(item)
+        job_url = job_data.get('job_url')
+        if not job_url:
+            continue
+        if job_url in seen_urls:
+            continue
+        seen_urls.add(job_url)
+        if stats is not None:
+            stats['new'] += 1
+        if known_urls is not None and known_urls.check(job_url):
+            continue
+        print(job_data)
+        page_records.append(job_data)
+    return page_records
+
+
+def get_data_http(session, url, seen_urls, api_url=SEARCH_API, known_urls=None, stats=None):
+    if RATE_LIMITER is not None:
+        RATE_LIMITER.wait(api_url)
+    try:
+        body_dict = search_jobs(session, url, api_url=api_url)
+    except Exception as exc:
+        print(f'search api request failed: {exc}')
+        report_outcome(session, api_url, 'blocked')
+        if stats is not None:
+            stats['blocked'] = True
+        return []
+
+    job_card_list = safe_get(body_dict, 'data', 'data', 'jobCardList') or []
+    report_outcome(session, api_url, 'ok' if job_card_list else 'empty')
+    read_totals(body_dict, stats)
+    return collect_job_cards(job_card_list, seen_urls, known_urls, stats)
+
+
+def get_db_connection(config=None):
+    return (config or DbConfig.from_env()).connect()
+
+
+def save_to_mysql(db, records, on_commit=None):
+    if JOB_WRITER is not None:
+        return JOB_WRITER.write(records, on_commit)
+    saved = db.run(upsert_jobs, records)
+    if on_commit is not None:
+        on_commit()
+    return saved
+
+
+def open_session(fingerprint, index=0):
+    driver = create_driver(fingerprint, index)
+    driver.identity = fingerprint.get('id')
+    driver.worker_index = index
+    driver.network_capture = create_capture(driver) if NETWORK_CAPTURE == 'cdp' else None
+    cookie = fingerprint.get('cookie')
+    if BROWSER_SESSIONS is None:
+        driver.get('https://www.liepin.com/')
+        if USE_FINGERPRINT:
+            apply_cookies(driver, cookie)
+    elif USE_FINGERPRINT and BROWSER_SESSIONS.needs_bootstrap(driver.browser_session, 'liepin', cookie):
+        driver.get('https://www.liepin.com/')
+        apply_cookies(driver, cookie, expiry=time.time() + BROWSER_SESSIONS.session_seconds)
+        BROWSER_SESSIONS.mark_warm(driver.browser_session, 'liepin', cookie)
+    return driver
+
+
+def close_session(driver):
+    if driver.network_capture is not None:
+        driver.network_capture.stop()
+    driver.quit()
+    if BROWSER_SESSIONS is not None:
+        BROWSER_SESSIONS.release(driver.browser_session)
+
+
+def build_search_url(base_url, current_page, page_size=None, key=None, city=None):
     parsed = urlparse(base_url)
     params = parse_qs(parsed.query, keep_blank_values=True)
     params['currentPage'] = [str(current_page)]
@@ -427,59 +526,158 @@ def build_search_url(base_url, current_page, page_size=None, key=None):
         params['pageSize'] = [str(page_size)]
     if key:
         params['key'] = [key]
+    if city:
+        params['city'] = [str(city)]
     query = urlencode(params, doseq=True)
     return urlunparse(parsed._replace(query=query))
 
 
-def to_excel(data_list):
-    if not data_list:
-        print('没有获取到数据')
-        return
-    df = pd.DataFrame(data_list)
-    df = df.drop_duplicates()
-    df.to_excel('招聘信息.xlsx', index=False)
-    print(f'数据已保存到 招聘信息.xlsx，共 {len(df)} 条记录')
-
-
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Liepin job crawler')
     parser.add_argument('--key', default='java', help='Search keyword, e.g. java')
     parser.add_argument('--pages', type=int, default=1, help='Number of pages to crawl')
+    parser.add_argument('--city', default='410', help='Liepin city code used in the search URL')
     parser.add_argument('--use-fingerprint', action='store_true', help='Enable fingerprint from .env')
     parser.add_argument('--retry-empty', type=int, default=2, help='Retry count when a page returns 0 records')
+    parser.add_argument('--page-wait', type=float, default=PAGE_WAIT, help='Max seconds to wait for the search API response')
+    parser.add_argument(
+        '--engine',
+        choices=['browser', 'http'],
+        default='browser',
+        help='browser: drive Chrome; http: call the search API directly with the fingerprint cookie/UA/XSRF token',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip jobs already stored for this source; only refresh their crawl_date/status',
+    )
+    parser.add_argument(
+        '--capture',
+        choices=['cdp', 'log'],
+        default='cdp',
+        help='cdp: intercept only the search API response; log: poll the Chrome performance log',
+    )
+    parser.add_argument(
+        '--block-profile',
+        choices=sorted(BLOCK_PROFILES),
+        default='lite',
+        help='lite: skip images/media/fonts/trackers; strict: also CSS; off: load everything',
+    )
+    parser.add_argument('--api-url', default=SEARCH_API, help='Search API endpoint for --engine http, e.g. a local stub server')
+    parser.add_argument(
+        '--export',
+        default='',
+        help='Also stream crawled records to this file (.jsonl, .csv or .parquet, optionally .gz), deduplicated',
+    )
+    add_checkpoint_arguments(parser)
+    add_browser_arguments(parser)
+    add_fingerprint_pool_arguments(parser)
+    add_rate_arguments(parser)
+    add_pagination_arguments(parser)
+    add_writer_arguments(parser)
+    add_db_arguments(parser)
     args = parser.parse_args()
     USE_FINGERPRINT = bool(args.use_fingerprint)
+    BROWSER_SESSIONS = open_browser_sessions(args)
+    NETWORK_CAPTURE = args.capture
+    BLOCK_PROFILE = args.block_profile
 
     key = args.key
-    base_search_url = 'https://www.liepin.com/zhaopin/?city=410&currentPage=0&pageSize=40'
+    base_search_url = build_search_url(LIEPIN_SEARCH_URL, 0, city=args.city)
     page_num = args.pages
-    page_size = 40
+    page_size = LIEPIN_PAGE_SIZE
 
     fingerprint = read_fingerprint(FINGERPRINT_FILE)
-    driver = create_driver(fingerprint)
-
-    driver.get('https://www.liepin.com/')
-    if USE_FINGERPRINT:
-        apply_cookies(driver, fingerprint.get('cookie'))
-
+    FINGERPRINT_POOL = open_fingerprint_pool(args, 'liepin')
+    RATE_LIMITER = open_rate_limiter(args)
+    if FINGERPRINT_POOL is not None:
+        USE_FINGERPRINT = True
+        fingerprint = FINGERPRINT_POOL.acquire(0)
     seen_urls = set()
-    connection = get_db_connection()
-
-    for current_page in range(0, page_num):
-        url = build_search_url(base_search_url, current_page, page_size=page_size, key=key)
-        records = get_data(driver, url, seen_urls)
-        retry_count = 0
-        while not records and retry_count < args.retry_empty:
-            retry_count += 1
-            print(f'page {current_page} returned 0 records, retry {retry_count}/{args.retry_empty}...')
-            time.sleep(2 + retry_count)
-            records = get_data(driver, url, seen_urls)
-        saved = save_to_mysql(connection, records)
-        print(f'page {current_page} saved {saved} records')
-        time.sleep(2)
+    driver = None
+    capture = None
+    session = None
+
+    checkpoints = CheckpointStore(args.checkpoint)
+    crawl_key = CheckpointStore.crawl_key('liepin', base_search_url, key)
+    done_pages, _pending = checkpoints.start_crawl(crawl_key, args.resume)
+    if done_pages:
+        print(f'resume: {len(done_pages)} pages done')
+
+    db = open_pool(args, **writer_connect_kwargs(args))
+    JOB_WRITER = open_writer(args, db)
+    exporter = JobExporter(args.export, dedup=True) if args.export else None
+    known_urls = None
+    if args.incremental:
+        known_urls = db.run(load_known_urls, 'liepin')
+        print(f'incremental: {len(known_urls)} known liepin jobs')
 
-    driver.quit()
-    connection.close()
+    try:
+        if args.engine == 'http':
+            session = create_session(fingerprint)
+            session.identity = fingerprint.get('id')
+            session.worker_index = 0
+
+            def fetch_page(url, stats):
+                return get_data_http(session, url, seen_urls, api_url=args.api_url, known_urls=known_urls, stats=stats)
+        else:
+            driver = open_session(fingerprint)
+            capture = driver.network_capture
 
+            def fetch_page(url, stats):
+                return get_data(driver, url, seen_urls, page_wait=args.page_wait, known_urls=known_urls, capture=capture, stats=stats)
 
+        def flush_known():
+            return db.run(touch_jobs, known_urls.take()) if known_urls is not None else 0
 
+        paginator = open_paginator(args, page_num)
+        for current_page in range(0, page_num):
+            if current_page in done_pages:
+                continue
+            url = build_search_url(base_search_url, current_page, page_size=page_size, key=key)
+            stats = page_stats()
+            records = fetch_page(url, stats)
+            touched = flush_known()
+            retry_count = 0
+            # A page made only of known or already seen jobs is not empty, so it must not trigger a retry.
+            while not records and not touched and not stats['listed'] and retry_count < args.retry_empty:
+                retry_count += 1
+                # The empty page already slowed the host down in RATE_LIMITER, so the retry waits longer.
+                print(f'page {current_page} returned 0 records, retry {retry_count}/{args.retry_empty}...')
+                stats = page_stats()
+                records = fetch_page(url, stats)
+                touched = flush_known()
+            saved = save_to_mysql(db, records, partial(checkpoints.mark_page_done, crawl_key, current_page))
+            if exporter is not None:
+                exporter.write(records)
+            print(f'page {current_page} saved {saved} records, touched {touched} known')
+            # Liepin counts pages from 0, the paginator from 1.
+            if not paginator.record(current_page + 1, **stats):
+                break
+        print(f'pagination: {paginator.summary()}')
+    finally:
+        # Buffered rows first: the writer thread is a daemon and would drop them if the browser shutdown raised.
+        if JOB_WRITER is not None:
+            JOB_WRITER.close()
+            print(JOB_WRITER.summary())
+        if exporter is not None:
+            exporter.close()
+            print(exporter.summary())
+        if driver:
+            close_session(driver)
+            if BROWSER_SESSIONS is not None:
+                print(BROWSER_SESSIONS.summary())
+        if session:
+            session.close()
+        if FINGERPRINT_POOL is not None:
+            FINGERPRINT_POOL.close()
+            print(FINGERPRINT_POOL.summary())
+        print(RATE_LIMITER.summary())
+        db.close()
+        print(db.summary())
+        wait_summary = WAIT_STATS.summary()
+        if wait_summary:
+            print(wait_summary)
+        transfer_summary = TRANSFER_STATS.summary(BLOCK_PROFILE)
+        if transfer_summary:
+            print(transfer_summary)
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+
+JOB_COLUMNS = (
+    'title',
+    'company',
+    'salary',
+    'salary_min',
+    'salary_max',
+    'salary_avg',
+    'location',
+    'experience',
+    'education',
+    'industry',
+    'job_type',
+    'company_nature',
+    'company_size',
+    'job_url',
+    'skills',
+    'source',
+    'company_logo',
+    'crawl_date',
+)
+
+# crawl_date changes on every crawl, so it is left out of the change check.
+HASH_COLUMNS = tuple(column for column in JOB_COLUMNS if column != 'crawl_date')
+INSERT_COLUMNS = JOB_COLUMNS + ('content_hash',)
+
+ROW_PLACEHOLDER = '(' + ', '.join(['%s'] * len(INSERT_COLUMNS)) + ')'
+UNCHANGED = 'jobs.content_hash <=> new.content_hash'
+# Row alias instead of VALUES(), which MySQL 8.0.20+ deprecates. Unchanged rows keep every column
+# but crawl_date, so secondary indexes are left alone; content_hash must be assigned last because
+# later assignments would otherwise compare against the new hash.
+UPSERT_UPDATE = ', '.join(
+    [f'{column}=IF({UNCHANGED}, jobs.{column}, new.{column})' for column in HASH_COLUMNS if column != 'job_url']
+    + [
+        'crawl_date=new.crawl_date',
+        f'updated_at=IF({UNCHANGED}, jobs.updated_at, CURRENT_TIMESTAMP)',
+        'content_hash=new.content_hash',
+    ]
+)
+
+
+def hash_value(value):
+    # Salaries as DECIMAL(10,2) text, so a row read back from MySQL hashes like the crawled record.
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'{float(value):.2f}'
+    return value
+
+
+def content_hash(item):
+    payload = json.dumps([hash_value(item[column]) for column in HASH_COLUMNS], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def build_upsert_sql(row_count):
+    return (
+        f"INSERT INTO jobs ({', '.join(INSERT_COLUMNS)}) "
+        f"VALUES {', '.join([ROW_PLACEHOLDER] * row_count)} AS new "
+        f"ON DUPLICATE KEY UPDATE {UPSERT_UPDATE}"
+    )
+
+
+DEFAULT_STAGING_FILE = '.jobs_staging.tsv'
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def staging_line(item):
+    # LOAD DATA default format: tab separated, backslash escaped, \N for NULL.
+    fields = []
+    for value in [item[column] for column in JOB_COLUMNS] + [content_hash(item)]:
+        fields.append('\\N' if value is None else str(value).translate(TSV_ESCAPES))
+    return '\t'.join(fields) + '\n'
+
+
+def load_and_merge(connection, path):
+    columns = ', '.join(INSERT_COLUMNS)
+    with connection.cursor() as cursor:
+        # Temporary and index-free apart from job_url, which lets REPLACE keep the last copy of a job.
+        cursor.execute('DROP TEMPORARY TABLE IF EXISTS jobs_staging')
+        cursor.execute(f'CREATE TEMPORARY TABLE jobs_staging SELECT {columns} FROM jobs LIMIT 0')
+        cursor.execute('ALTER TABLE jobs_staging ADD PRIMARY KEY (job_url)')
+        loaded = cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE jobs_staging CHARACTER SET utf8mb4 ({columns})",
+            (os.path.abspath(path),),
+        )
+        merged = cursor.execute(
+            f'INSERT INTO jobs ({columns}) SELECT * FROM (SELECT {columns} FROM jobs_staging) AS new '
+            f'ON DUPLICATE KEY UPDATE {UPSERT_UPDATE}'
+        )
+        cursor.execute('DROP TEMPORARY TABLE jobs_staging')
+    return loaded, merged
+
+
+def upsert_jobs(connection, records, batch_rows=500):
+    if not records:
+        return 0
+
+    # One transaction per flush: a single commit instead of one per page on the autocommit connection.
+    connection.begin()
+    try:
+        with connection.cursor() as cursor:
+            for start in range(0, len(records), batch_rows):
+                chunk = records[start:start + batch_rows]
+                params = []
+                for item in chunk:
+                    params.extend(item[column] for column in JOB_COLUMNS)
+                    params.append(content_hash(item))
+                cursor.execute(build_upsert_sql(len(chunk)), params)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return len(records)
+
+
+class JobWriter:
+    # Buffers records across pages and upserts them from a background thread, so the crawl
+    # loop never waits on MySQL unless the buffer reaches max_buffer.
+    def __init__(self, db, batch_size=200, flush_interval=2.0, max_buffer=5000):
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_buffer = max(self.batch_size, int(max_buffer))
+        self.cond = threading.Condition()
+        self.buffer = []
+        self.callbacks = []
+        self.closed = False
+        self.forced = False
+        self.busy = False
+        self.flushes = 0
+        self.rows = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, records, on_commit=None):
+        # on_commit runs in the writer thread once these records are committed.
+        with self.cond:
+            if self.closed:
+                raise RuntimeError('JobWriter is closed')
+            while len(self.buffer) >= self.max_buffer:
+                self.cond.wait()
+            self.buffer.extend(records)
+            if on_commit is not None:
+                self.callbacks.append(on_commit)
+            if len(self.buffer) >= self.batch_size:
+                self.cond.notify_all()
+        return len(records)
+
+    def flush(self):
+        with self.cond:
+            self.forced = True
+            self.cond.notify_all()
+            while self.buffer or self.callbacks or self.busy:
+                self.cond.wait()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+
+    def summary(self):
+        average = self.latency_total / self.flushes * 1000 if self.flushes else 0.0
+        return (
+            f'job writer: flushes={self.flushes} rows={self.rows} failed={self.failed} '
+            f'avg_flush={average:.1f}ms max_flush={self.latency_max * 1000:.1f}ms'
+        )
+
+    def _run(self):
+        while True:
+            with self.cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self.closed and not self.forced and len(self.buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                records, self.buffer = self.buffer, []
+                callbacks, self.callbacks = self.callbacks, []
+                closing = self.closed
+                self.forced = False
+                self.busy = bool(records or callbacks)
+                self.cond.notify_all()
+
+            if records or callbacks:
+                self._flush(records, callbacks)
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+            if closing:
+                return
+
+    def _flush(self, records, callbacks):
+        started = time.perf_counter()
+        try:
+            self.db.run(upsert_jobs, records, batch_rows=self.batch_size)
+        except Exception as exc:
+            # Callbacks are dropped too, so checkpoints never point past rows that were not saved.
+            self.failed += len(records)
+            print(f'job writer: flush of {len(records)} rows failed: {exc}')
+            return
+
+        elapsed = time.perf_counter() - started
+        if records:
+            self.flushes += 1
+            self.rows += len(records)
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                print(f'job writer: commit callback failed: {exc}')
+
+
+class StagingWriter:
+    # Bulk path for large one-off crawls: records are spooled to a TSV file and merged with one
+    # LOAD DATA LOCAL INFILE plus one set-based INSERT ... SELECT every batch_rows rows.
+    def __init__(self, db, path=DEFAULT_STAGING_FILE, batch_rows=100000):
+        self.db = db
+        self.path = path
+        self.batch_rows = max(1, int(batch_rows))
+        self.lock = threading.Lock()
+        self.file = open(path, 'w', encoding='utf-8', newline='\n')
+        self.spooled = 0
+        self.callbacks = []
+        self.merges = 0
+        self.rows = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def write(self, records, on_commit=None):
+        with self.lock:
+            self.file.writelines(staging_line(item) for item in records)
+            self.spooled += len(records)
+            if on_commit is not None:
+                self.callbacks.append(on_commit)
+            if self.spooled >= self.batch_rows:
+                self._merge()
+        return len(records)
+
+    def flush(self):
+        with self.lock:
+            self._merge()
+
+    def close(self):
+        with self.lock:
+            self._merge()
+            self.file.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def summary(self):
+        average = self.latency_total / self.merges * 1000 if self.merges else 0.0
+        return (
+            f'staging writer: merges={self.merges} rows={self.rows} failed={self.failed} '
+            f'avg_merge={average:.1f}ms max_merge={self.latency_max * 1000:.1f}ms'
+        )
+
+    def _merge(self):
+        if not self.spooled and not self.callbacks:
+            return
+        self.file.flush()
+        callbacks, self.callbacks = self.callbacks, []
+        started = time.perf_counter()
+        try:
+            if self.spooled:
+                self.db.run(load_and_merge, self.path)
+        except Exception as exc:
+            # Keep the spooled rows so they can be loaded by hand; checkpoints are not advanced.
+            self.failed += self.spooled
+            failed_path = f'{self.path}.{int(time.time())}.failed'
+            self.file.close()
+            os.replace(self.path, failed_path)
+            self.file = open(self.path, 'w', encoding='utf-8', newline='\n')
+            print(f'staging writer: merge of {self.spooled} rows failed, kept in {failed_path}: {exc}')
+            self.spooled = 0
+            return
+
+        elapsed = time.perf_counter() - started
+        if self.spooled:
+            self.merges += 1
+            self.rows += self.spooled
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+        self.file.seek(0)
+        self.file.truncate()
+        self.spooled = 0
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as exc:
+                print(f'staging writer: commit callback failed: {exc}')
+
+
+def add_writer_arguments(parser):
+    parser.add_argument('--write-batch', type=int, default=200, help='Rows per background upsert batch, 0 = write each page synchronously')
+    parser.add_argument('--write-interval', type=float, default=2.0, help='Max seconds a buffered row waits before being flushed')
+    parser.add_argument(
+        '--ingest',
+        choices=['upsert', 'bulk'],
+        default='upsert',
+        help='bulk: spool rows to a TSV file and merge them via LOAD DATA LOCAL INFILE (needs local_infile on the server)',
+    )
+    parser.add_argument('--bulk-rows', type=int, default=100000, help='Rows spooled per LOAD DATA merge for --ingest bulk')
+    parser.add_argument('--staging-file', default=DEFAULT_STAGING_FILE, help='Staging TSV path for --ingest bulk')
+
+
+def writer_connect_kwargs(args):
+    return {'local_infile': True} if args.ingest == 'bulk' else {}
+
+
+def open_writer(args, db):
+    if args.ingest == 'bulk':
+        return StagingWriter(db, path=args.staging_file, batch_rows=args.bulk_rows)
+    if args.write_batch <= 0:
+        return None
+    return JobWriter(db, batch_size=args.write_batch, flush_interval=args.write_interval)
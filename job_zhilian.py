@@ -1,30 +1,77 @@
 ﻿import argparse
+import asyncio
 import base64
 import json
 import random
 import re
 import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+from functools import partial
+from urllib.parse import parse_qs, quote, urlencode, urlparse, urlunparse
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
-try:
-    import pymysql
-except ImportError:
-    pymysql = None
+from async_fetch import AsyncFetcher
+from browser_profiles import add_browser_arguments, open_browser_sessions
+from cdp_capture import NetworkCapture
+from checkpoint import CheckpointStore, add_checkpoint_arguments
+from crawl_pool import WorkerPool
+from db import DbConfig, add_db_arguments, open_pool
+from fast_load import BLOCK_PROFILES, STATS as TRANSFER_STATS, apply_block_profile, configure_options
+from fingerprint_pool import add_fingerprint_pool_arguments, open_fingerprint_pool
+from incremental import load_known_urls, touch_jobs
+from job_writer import HASH_COLUMNS, add_writer_arguments, content_hash, open_writer, upsert_jobs, writer_connect_kwargs
+from page_cache import add_cache_arguments, open_cache
+from pagination import add_pagination_arguments, find_totals, open_paginator, page_stats
+from rate_limit import RateLimiter, add_rate_arguments, open_rate_limiter
+from readiness import STATS as WAIT_STATS, wait_for_initial_state, wait_for_selector
+from salary import parse_salary
+from skill_tagger import load_tagger
 
 CHROME_BINARY = None
 HEADLESS = False
 FINGERPRINT_FILE = '.env'
 USE_FINGERPRINT = False
+PAGE_CACHE = None
+BROWSER_SESSIONS = None
+FINGERPRINT_POOL = None
+RATE_LIMITER = None
+JOB_WRITER = None
+SKILL_TAGGER = None
+OFFLINE = False
+NETWORK_CAPTURE = 'cdp'
+BLOCK_PROFILE = 'lite'
 
 DEFAULT_ZHILIAN_URL = 'https://www.zhaopin.com/sou/jl538/kw01L00O80EO062/p1?srccode=401801'
+ZHILIAN_SEARCH_URL = 'https://www.zhaopin.com/sou/jl{city}/kw{keyword}/p1'
 SKILLS_DIR = 'skills'
+# Upper bounds only: readiness checks return as soon as the page has what we need.
+PAGE_WAIT = 10
+DETAIL_WAIT = 6
+
+SEARCH_LINK_SELECTORS = [
+    "a[href*='jobs.zhaopin.com']",
+    "a[href*='job_detail']",
+    "a[href*='/job/']",
+]
+# Only XHR/fetch responses from zhaopin hosts can carry job lists.
+CAPTURE_PATTERNS = [('*zhaopin.com*', 'XHR'), ('*zhaopin.com*', 'Fetch')]
+DESCRIPTION_SELECTORS = [
+    "[data-selector='job-intro-content']",
+    "[class*='job-summary']",
+    "[class*='describ']",
+    "[class*='detail-content']",
+    "[class*='job-detail']",
+]
+JSON_DECODER = json.JSONDecoder()
+STATE_TOKEN_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]')
+TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
+UNDEFINED_PATTERN = re.compile(r'(?<=[:,\[])undefined(?=[,}\]])')
 
 def load_env_file(env_path='.env'):
     data = {}
@@ -99,7 +146,7 @@ def read_fingerprint(file_path):
     }
 
 
-def apply_cookies(driver, cookie_string, domain='.zhaopin.com'):
+def apply_cookies(driver, cookie_string, domain='.zhaopin.com', expiry=None):
     if not cookie_string:
         return
     cookies = [c.strip() for c in cookie_string.split(';') if c.strip()]
@@ -107,19 +154,21 @@ def apply_cookies(driver, cookie_string, domain='.zhaopin.com'):
         if '=' not in cookie:
             continue
         name, value = cookie.split('=', 1)
+        item = {
+            'name': name.strip(),
+            'value': value.strip(),
+            'domain': domain,
+        }
+        if expiry:
+            # Without an expiry Chrome drops it on exit instead of keeping it in the profile.
+            item['expiry'] = int(expiry)
         try:
-            driver.add_cookie(
-                {
-                    'name': name.strip(),
-                    'value': value.strip(),
-                    'domain': domain,
-                }
-            )
+            driver.add_cookie(item)
         except Exception:
             continue
 
 
-def create_driver(fingerprint):
+def create_driver(fingerprint, index=0):
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_argument('--disable-gpu')
@@ -130,19 +179,47 @@ def create_driver(fingerprint):
     if CHROME_BINARY:
         chrome_options.binary_location = CHROME_BINARY
 
+    browser_session = BROWSER_SESSIONS.configure(chrome_options, index) if BROWSER_SESSIONS is not None else None
+    attached = BROWSER_SESSIONS is not None and bool(BROWSER_SESSIONS.attach)
+
     if USE_FINGERPRINT and fingerprint.get('user_agent'):
         chrome_options.add_argument(f"--user-agent={fingerprint['user_agent']}")
+    configure_options(chrome_options, BLOCK_PROFILE, attached)
 
-    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if NETWORK_CAPTURE == 'log':
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.implicitly_wait(8)
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+    except Exception:
+        if BROWSER_SESSIONS is not None:
+            BROWSER_SESSIONS.release(browser_session)
+        raise
+    driver.browser_session = browser_session
+    # readiness.py does the waiting; an implicit wait would stall on every selector that is absent.
+    driver.implicitly_wait(0)
     driver.set_page_load_timeout(35)
     driver.execute_cdp_cmd('Network.enable', {})
+    if attached and USE_FINGERPRINT and fingerprint.get('user_agent'):
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': fingerprint['user_agent']})
+    apply_block_profile(driver, BLOCK_PROFILE)
+
+    driver.network_capture = None
+    if NETWORK_CAPTURE == 'cdp':
+        driver.network_capture = NetworkCapture(driver, CAPTURE_PATTERNS).start()
 
     return driver
 
 
+def close_driver(driver):
+    capture = getattr(driver, 'network_capture', None)
+    if capture is not None:
+        capture.stop()
+    driver.quit()
+    if BROWSER_SESSIONS is not None:
+        BROWSER_SESSIONS.release(getattr(driver, 'browser_session', None))
+
+
 def safe_get(obj, *keys):
     for key in keys:
         if not isinstance(obj, dict) or key not in obj:
@@ -208,44 +285,8 @@ def normalize_skills(value):
     return [str(value).strip()]
 
 
-def parse_salary(salary_text):
-    if not salary_text:
-        return None, None, None
-    text = str(salary_text).replace(' ', '')
-    if '面议' in text:
-        return None, None, None
-    if '·' in text:
-        text = text.split('·', 1)[0]
-
-    is_year = '年' in text
-    unit = None
-    if '万' in text:
-        unit = 'wan'
-    elif '千' in text:
-        unit = 'qian'
-    elif re.search(r'[kK]', text):
-        unit = 'k'
-
-    numbers = re.findall(r'\d+(?:\.\d+)?', text)
-    if not numbers:
-        return None, None, None
-
-    min_value = float(numbers[0])
-    max_value = float(numbers[1]) if len(numbers) > 1 else min_value
-
-    if unit == 'wan':
-        min_value *= 10
-        max_value *= 10
-    elif unit == 'qian':
-        min_value *= 1
-        max_value *= 1
-
-    if is_year:
-        min_value /= 12
-        max_value /= 12
-
-    avg_value = (min_value + max_value) / 2
-    return round(min_value, 2), round(max_value, 2), round(avg_value, 2)
+def keyword_search_url(city, keyword):
+    return ZHILIAN_SEARCH_URL.format(city=city, keyword=quote(keyword))
 
 
 def build_search_url(base_url, page):
@@ -284,19 +325,17 @@ def is_security_page(html_text):
     return any(marker.lower() in html_low for marker in markers)
 
 
-def iter_dicts(obj):
-    stack = [obj]
-    while stack:
-        current = stack.pop()
-        if isinstance(current, dict):
-            yield current
-            for value in current.values():
-                if isinstance(value, (dict, list)):
-                    stack.append(value)
-        elif isinstance(current, list):
-            for item in current:
-                if isinstance(item, (dict, list)):
-                    stack.append(item)
+def find_state_end(page_source, start):
+    # Strings are consumed whole by the compiled pattern, so only real braces are counted.
+    level = 0
+    for token in STATE_TOKEN_PATTERN.finditer(page_source, start):
+        if token.group() == '{':
+            level += 1
+        elif token.group() == '}':
+            level -= 1
+            if level == 0:
+                return token.end()
+    return -1
 
 
 def extract_initial_state(page_source):
@@ -309,59 +348,35 @@ def extract_initial_state(page_source):
     if start < 0:
         return None
 
-    level = 0
-    in_string = False
-    escaped = False
-    end = -1
-
-    for i in range(start, len(page_source)):
-        ch = page_source[i]
-        if in_string:
-            if escaped:
-                escaped = False
-            elif ch == '\\\\':
-                escaped = True
-            elif ch == '\"':
-                in_string = False
-            continue
-
-        if ch == '\"':
-            in_string = True
-        elif ch == '{':
-            level += 1
-        elif ch == '}':
-            level -= 1
-            if level == 0:
-                end = i + 1
-                break
+    # raw_decode parses in place and stops at the end of the object, without slicing the page.
+    try:
+        return JSON_DECODER.raw_decode(page_source, start)[0]
+    except ValueError:
+        pass
 
+    end = find_state_end(page_source, start)
     if end < 0:
         return None
 
-    text = page_source[start:end]
+    # Mild cleanup for trailing commas and bare undefined in rare pages.
+    text = TRAILING_COMMA_PATTERN.sub(r'\1', page_source[start:end])
+    text = UNDEFINED_PATTERN.sub('null', text)
     try:
         return json.loads(text)
-    except Exception:
-        # Mild cleanup for trailing commas in rare pages.
-        text = re.sub(r',\\s*}', '}', text)
-        text = re.sub(r',\\s*]', ']', text)
-        try:
-            return json.loads(text)
-        except Exception:
-            return None
+    except ValueError:
+        return None
 
 
-def extract_jobs_from_initial_state(page_source):
+def extract_jobs_from_initial_state(page_source, stats=None):
     state = extract_initial_state(page_source)
     if not isinstance(state, dict):
         return []
+    if stats is not None:
+        stats['total'], stats['total_pages'] = find_totals(state)
 
     result = []
     seen = set()
-    for obj in iter_dicts(state):
-        rec = extract_from_object(obj)
-        if not rec:
-            continue
+    for rec in INITIAL_STATE_LOCATOR.extract(state):
         job_url = rec.get('job_url')
         if not job_url or job_url in seen:
             continue
@@ -492,14 +507,12 @@ def extract_from_object(obj):
     }
 
 
-def extract_jobs_from_performance(driver):
-    result = []
-    seen = set()
-
+def read_performance_bodies(driver):
+    bodies = []
     try:
         logs = [json.loads(log['message'])['message'] for log in driver.get_log('performance')]
     except Exception:
-        return result
+        return bodies
 
     for log in logs:
         if log.get('method') != 'Network.responseReceived':
@@ -524,14 +537,125 @@ def extract_jobs_from_performance(driver):
             body = body_data.get('body', '')
             if body_data.get('base64Encoded'):
                 body = base64.b64decode(body).decode('utf-8', errors='ignore')
+        except Exception:
+            continue
+        bodies.append(body)
+
+    return bodies
+
+
+def job_path_pattern(path):
+    return tuple('*' if isinstance(step, int) else step for step in path)
+
+
+def resolve_path(tree, pattern):
+    nodes = [tree]
+    for step in pattern:
+        next_nodes = []
+        for node in nodes:
+            if step == '*':
+                if isinstance(node, list):
+                    next_nodes.extend(node)
+            elif isinstance(node, dict) and step in node:
+                next_nodes.append(node[step])
+        nodes = next_nodes
+    return [node for node in nodes if isinstance(node, dict)]
+
+
+def scan_job_objects(tree):
+    # Full walk in document order. Only the outermost matching objects define a path; objects nested
+    # inside a job (its own "job" sub-dict and the like) are still extracted but not cached.
+    records = []
+    patterns = []
+    stack = [(tree, (), False)]
+    while stack:
+        current, path, inside_job = stack.pop()
+        if isinstance(current, dict):
+            rec = extract_from_object(current)
+            if rec:
+                records.append(rec)
+                pattern = job_path_pattern(path)
+                if not inside_job and pattern not in patterns:
+                    patterns.append(pattern)
+                inside_job = True
+            for key, value in reversed(list(current.items())):
+                if isinstance(value, (dict, list)):
+                    stack.append((value, path + (key,), inside_job))
+        elif isinstance(current, list):
+            for index in range(len(current) - 1, -1, -1):
+                if isinstance(current[index], (dict, list)):
+                    stack.append((current[index], path + (index,), inside_job))
+    return records, patterns
+
+
+class JobListLocator:
+    # Remembers where job objects sit for each layout (e.g. data.list.*), so later pages only run
+    # extract_from_object on those objects. The full tree scan is the fallback when a path goes stale.
+    def __init__(self, name):
+        self.name = name
+        self.paths = {}
+        self.lock = threading.Lock()
+        self.cached = 0
+        self.scans = 0
+
+    @staticmethod
+    def layout_key(tree):
+        return tuple(sorted(tree)) if isinstance(tree, dict) else ('[]',)
+
+    def extract(self, tree):
+        key = self.layout_key(tree)
+        with self.lock:
+            patterns = self.paths.get(key)
+
+        if patterns:
+            records = []
+            for pattern in patterns:
+                for obj in resolve_path(tree, pattern):
+                    rec = extract_from_object(obj)
+                    if rec:
+                        records.append(rec)
+            if records:
+                with self.lock:
+                    self.cached += 1
+                return records
+
+        records, patterns = scan_job_objects(tree)
+        with self.lock:
+            self.scans += 1
+            if patterns:
+                self.paths[key] = patterns
+        return records
+
+    def summary(self):
+        with self.lock:
+            paths = sorted({'.'.join(map(str, pattern)) or '<root>' for patterns in self.paths.values() for pattern in patterns})
+            return f'job locator {self.name}: cached={self.cached} full_scans={self.scans} paths={paths}'
+
+
+INITIAL_STATE_LOCATOR = JobListLocator('initial_state')
+RESPONSE_LOCATOR = JobListLocator('api_response')
+
+
+def extract_jobs_from_performance(driver):
+    capture = getattr(driver, 'network_capture', None)
+    if capture is not None:
+        bodies = [item.body for item in capture.responses() if item.body]
+    else:
+        bodies = read_performance_bodies(driver)
+    return extract_jobs_from_bodies(bodies)
+
+
+def extract_jobs_from_bodies(bodies):
+    result = []
+    seen = set()
+
+    for body in bodies:
+        try:
             parsed = json.loads(body)
         except Exception:
             continue
 
-        for obj in iter_dicts(parsed):
-            rec = extract_from_object(obj)
-            if not rec:
-                continue
+        for rec in RESPONSE_LOCATOR.extract(parsed):
             job_url = rec.get('job_url')
             if not job_url or job_url in seen:
                 continue
@@ -545,14 +669,8 @@ def extract_jobs_from_dom(driver):
     result = []
     seen = set()
 
-    selectors = [
-        "a[href*='jobs.zhaopin.com']",
-        "a[href*='job_detail']",
-        "a[href*='/job/']",
-    ]
-
     links = []
-    for selector in selectors:
+    for selector in SEARCH_LINK_SELECTORS:
         try:
             links.extend(driver.find_elements(By.CSS_SELECTOR, selector))
         except Exception:
@@ -670,16 +788,8 @@ def extract_description_from_html(html):
 
 
 def extract_description_from_page(driver):
-    selectors = [
-        "[data-selector='job-intro-content']",
-        "[class*='job-summary']",
-        "[class*='describ']",
-        "[class*='detail-content']",
-        "[class*='job-detail']",
-    ]
-
     best = ''
-    for selector in selectors:
+    for selector in DESCRIPTION_SELECTORS:
         try:
             nodes = driver.find_elements(By.CSS_SELECTOR, selector)
         except Exception:
@@ -695,7 +805,8 @@ def extract_description_from_page(driver):
     return extract_description_from_html(driver.page_source)
 
 
-COMMON_SKILLS = [
+# Used only when skills/aliases.json is missing; the tagger dictionary lives in that file.
+COMMON_SKILLS = (
     'Java',
     'Spring',
     'Spring Boot',
@@ -720,7 +831,7 @@ COMMON_SKILLS = [
     'React',
     '微服务',
     '分布式',
-]
+)
 
 
 def extract_skills_from_description(description):
@@ -728,22 +839,10 @@ def extract_skills_from_description(description):
     if not text:
         return []
 
-    found = []
-    low = text.lower()
-    for item in COMMON_SKILLS:
-        if item.lower() in low:
-            found.append(item)
-
-    # dedupe keep order
-    dedup = []
-    seen = set()
-    for item in found:
-        if item not in seen:
-            seen.add(item)
-            dedup.append(item)
-
-    if dedup:
-        return dedup[:8]
+    tagger = SKILL_TAGGER or load_tagger(SKILLS_DIR, COMMON_SKILLS)
+    found = tagger.tag(text, limit=8)
+    if found:
+        return found
 
     # fallback from description lines
     lines = [line.strip(' ：:;；-') for line in text.splitlines() if line.strip()]
@@ -796,14 +895,54 @@ def pick_fallback_skills(skill_lib, keyword, title, count=4):
     if not pool:
         return []
 
+    # Seeded by the job itself so a recrawl picks the same skills and the content hash stays stable.
+    rng = random.Random(f'{key}|{title_low}')
     if len(pool) <= count:
-        random.shuffle(pool)
+        rng.shuffle(pool)
         return pool
 
-    return random.sample(pool, count)
+    return rng.sample(pool, count)
+
+
+def cached_description(job_url):
+    # None when the page is not cached or the cached copy does not parse, so callers fetch it live.
+    html_text = PAGE_CACHE.get(job_url) if PAGE_CACHE is not None else None
+    if html_text is None or is_security_page(html_text):
+        return None
+    return extract_description_from_html(html_text) or None
+
+
+def cache_detail_page(job_url, html_text):
+    # Only pages the cached path can parse again; a timed-out render would otherwise stick until the TTL.
+    description = extract_description_from_html(html_text)
+    if PAGE_CACHE is not None and description:
+        PAGE_CACHE.put(job_url, html_text)
+    return description
+
+
+def fetch_description(driver, job_url, wait_seconds=DETAIL_WAIT):
+    description = cached_description(job_url)
+    if description is not None or OFFLINE:
+        return description
+
+    try:
+        if RATE_LIMITER is not None:
+            RATE_LIMITER.wait(job_url)
+        driver.get(job_url)
+        wait_for_selector(driver, DESCRIPTION_SELECTORS, wait_seconds, texts=['安全验证'], label='zhilian_detail')
+        TRANSFER_STATS.record(driver, 'zhilian_detail')
+        html_text = driver.page_source
+        if is_security_page(html_text):
+            report_outcome(driver, job_url, 'blocked')
+            return None
+        report_outcome(driver, job_url, 'ok')
+        cache_detail_page(job_url, html_text)
+        return extract_description_from_page(driver)
+    except Exception:
+        return None
 
 
-def finalize_record(record, driver, keyword, skill_lib, with_detail=True, wait_seconds=2):
+def finalize_record(record, driver, keyword, skill_lib, with_detail=True, wait_seconds=DETAIL_WAIT, fallback_skills=True):
     title = normalize_text(record.get('title'))
     company = normalize_text(record.get('company'))
     salary = normalize_text(record.get('salary'))
@@ -819,18 +958,12 @@ def finalize_record(record, driver, keyword, skill_lib, with_detail=True, wait_s
     if with_detail and (not skills):
         job_url = normalize_text(record.get('job_url'))
         if job_url:
-            try:
-                driver.get(job_url)
-                time.sleep(wait_seconds)
-                if not is_security_page(driver.page_source):
-                    description = extract_description_from_page(driver)
-            except Exception:
-                pass
+            description = fetch_description(driver, job_url, wait_seconds) or description
 
     if not skills:
         skills = extract_skills_from_description(description)
 
-    if not skills:
+    if not skills and fallback_skills:
         skills = pick_fallback_skills(skill_lib, keyword=keyword, title=title, count=4)
 
     return {
@@ -855,25 +988,54 @@ def finalize_record(record, driver, keyword, skill_lib, with_detail=True, wait_s
     }
 
 
-def get_data(driver, url, seen_urls, keyword, skill_lib, detail_wait=2):
-    try:
-        driver.get_log('performance')
-    except Exception:
-        pass
+def load_search_page(driver, url, page_wait=PAGE_WAIT, stats=None):
+    capture = getattr(driver, 'network_capture', None)
+    if capture is not None:
+        capture.clear()
+    else:
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
 
+    if RATE_LIMITER is not None:
+        RATE_LIMITER.wait(url)
     driver.get(url)
-    time.sleep(4)
+    wait_for_initial_state(driver, page_wait, extra_selectors=SEARCH_LINK_SELECTORS, label='zhilian_search')
+    TRANSFER_STATS.record(driver, 'zhilian_search')
 
     html_text = driver.page_source
     if is_security_page(html_text):
         print(f'security verification triggered on search page: {url}')
+        report_outcome(driver, url, 'blocked')
+        if stats is not None:
+            stats['blocked'] = True
         return []
 
-    raw_records = extract_jobs_from_initial_state(html_text)
+    raw_records = extract_jobs_from_initial_state(html_text, stats)
     if not raw_records:
         raw_records = extract_jobs_from_performance(driver)
     if not raw_records:
         raw_records = extract_jobs_from_dom(driver)
+    report_outcome(driver, url, 'ok' if raw_records else 'empty')
+    if stats is not None:
+        stats['listed'] = len(raw_records)
+    return raw_records
+
+
+def get_data(
+    driver,
+    url,
+    seen_urls,
+    keyword,
+    skill_lib,
+    detail_wait=DETAIL_WAIT,
+    with_detail=True,
+    page_wait=PAGE_WAIT,
+    known_urls=None,
+    stats=None,
+):
+    raw_records = load_search_page(driver, url, page_wait=page_wait, stats=stats)
 
     page_records = []
     for item in raw_records:
@@ -883,14 +1045,20 @@ def get_data(driver, url, seen_urls, keyword, skill_lib, detail_wait=2):
         if job_url in seen_urls:
             continue
         seen_urls.add(job_url)
+        if stats is not None:
+            # Known jobs still count as new: they only repeat the database, not this run's pages.
+            stats['new'] += 1
+        if known_urls is not None and known_urls.check(job_url):
+            continue
 
         final = finalize_record(
             item,
             driver=driver,
             keyword=keyword,
             skill_lib=skill_lib,
-            with_detail=True,
+            with_detail=with_detail,
             wait_seconds=detail_wait,
+            fallback_skills=with_detail,
         )
 
         if not final.get('job_url'):
@@ -902,68 +1070,489 @@ def get_data(driver, url, seen_urls, keyword, skill_lib, detail_wait=2):
     return page_records
 
 
-def get_db_connection():
-    if pymysql is None:
-        raise RuntimeError('Missing dependency: pymysql. Install via pip install pymysql')
+def get_db_connection(config=None):
+    return (config or DbConfig.from_env()).connect()
 
-    return pymysql.connect(
-        host='127.0.0.1',
-        port=3306,
-        user='root',
-        password='root',
-        database='recruitment_system',
-        charset='utf8mb4',
-        autocommit=True,
-    )
 
+def save_to_mysql(db, records, on_commit=None):
+    if JOB_WRITER is not None:
+        return JOB_WRITER.write(records, on_commit)
+    saved = db.run(upsert_jobs, records)
+    if on_commit is not None:
+        on_commit()
+    return saved
+
+
+def load_pending_details(connection, limit=0):
+    # Rows written by the listing stage keep skills='[]' until a detail page fills them in.
+    sql = "SELECT job_url, title FROM jobs WHERE source='zhilian' AND skills IN ('', '[]') ORDER BY id ASC"
+    params = ()
+    if limit:
+        sql += ' LIMIT %s'
+        params = (limit,)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def update_record_skills(connection, job_url, skills):
+    # skills is part of content_hash, so the hash is recomputed from the locked row; otherwise the
+    # next crawl of the same job would look like a change.
+    select_sql = f"SELECT {', '.join(HASH_COLUMNS)} FROM jobs WHERE job_url=%s FOR UPDATE"
+    update_sql = 'UPDATE jobs SET skills=%s, content_hash=%s, updated_at=CURRENT_TIMESTAMP WHERE job_url=%s'
+    connection.begin()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(select_sql, (job_url,))
+            row = cursor.fetchone()
+            if row is not None:
+                item = dict(zip(HASH_COLUMNS, row))
+                item['skills'] = json.dumps(skills, ensure_ascii=False)
+                cursor.execute(update_sql, (item['skills'], content_hash(item), job_url))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def enrich_record(driver, job_url, title, keyword, skill_lib, wait_seconds=DETAIL_WAIT):
+    description = fetch_description(driver, job_url, wait_seconds)
+    if description is None:
+        return None
+    skills = extract_skills_from_description(description)
+    if not skills:
+        skills = pick_fallback_skills(skill_lib, keyword=keyword, title=title, count=4)
+    return skills
+
+
+def save_page(db, records, known_urls=None, on_commit=None):
+    saved = save_to_mysql(db, records, on_commit)
+    touched = db.run(touch_jobs, known_urls.take()) if known_urls is not None else 0
+    return saved, touched
 
-def save_to_mysql(connection, records):
-    if not records:
-        return 0
-
-    sql = (
-        "INSERT INTO jobs (title, company, salary, salary_min, salary_max, salary_avg, "
-        "location, experience, education, industry, job_type, company_nature, company_size, "
-        "job_url, skills, source, company_logo, crawl_date) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
-        "ON DUPLICATE KEY UPDATE "
-        "title=VALUES(title), company=VALUES(company), salary=VALUES(salary), "
-        "salary_min=VALUES(salary_min), salary_max=VALUES(salary_max), salary_avg=VALUES(salary_avg), "
-        "location=VALUES(location), experience=VALUES(experience), education=VALUES(education), "
-        "industry=VALUES(industry), job_type=VALUES(job_type), company_nature=VALUES(company_nature), "
-        "company_size=VALUES(company_size), skills=VALUES(skills), source=VALUES(source), "
-        "company_logo=VALUES(company_logo), crawl_date=VALUES(crawl_date), "
-        "updated_at=CURRENT_TIMESTAMP"
-    )
 
-    values = []
-    for item in records:
-        values.append(
-            (
-                item['title'],
-                item['company'],
-                item['salary'],
-                item['salary_min'],
-                item['salary_max'],
-                item['salary_avg'],
-                item['location'],
-                item['experience'],
-                item['education'],
-                item['industry'],
-                item['job_type'],
-                item['company_nature'],
-                item['company_size'],
-                item['job_url'],
-                item['skills'],
-                item['source'],
-                item['company_logo'],
-                item['crawl_date'],
+def load_known(args, db):
+    if not args.incremental:
+        return None
+    known_urls = db.run(load_known_urls, 'zhilian')
+    print(f'incremental: {len(known_urls)} known zhilian jobs')
+    return known_urls
+
+
+def start_checkpoint(args, stage):
+    store = CheckpointStore(args.checkpoint)
+    key = CheckpointStore.crawl_key(f'zhilian:{stage}', args.base_url, args.key)
+    done_pages, pending = store.start_crawl(key, args.resume)
+    if done_pages or pending:
+        print(f'resume: {len(done_pages)} pages done, {len(pending)} detail pages pending')
+    return store, key, done_pages, pending
+
+
+def open_session(fingerprint, index=0):
+    identity = FINGERPRINT_POOL.acquire(index) if FINGERPRINT_POOL is not None else None
+    if identity is not None:
+        fingerprint = identity
+    driver = create_driver(fingerprint, index)
+    driver.identity = identity['id'] if identity is not None else None
+    driver.worker_index = index
+    if not USE_FINGERPRINT:
+        return driver
+    cookie = fingerprint.get('cookie')
+    if BROWSER_SESSIONS is None:
+        driver.get('https://www.zhaopin.com/')
+        apply_cookies(driver, cookie, domain='.zhaopin.com')
+    elif BROWSER_SESSIONS.needs_bootstrap(driver.browser_session, 'zhilian', cookie):
+        driver.get('https://www.zhaopin.com/')
+        apply_cookies(driver, cookie, domain='.zhaopin.com', expiry=time.time() + BROWSER_SESSIONS.session_seconds)
+        BROWSER_SESSIONS.mark_warm(driver.browser_session, 'zhilian', cookie)
+    return driver
+
+
+def rotate_identity(driver):
+    # The identity just hit a security page: swap in the next one on the same browser.
+    identity = FINGERPRINT_POOL.acquire(driver.worker_index)
+    wait = FINGERPRINT_POOL.cooldown_remaining(identity['id'])
+    if wait:
+        print(f'all identities cooling down, waiting {wait:.0f}s for {identity["id"]}')
+        time.sleep(wait)
+    if identity['id'] == driver.identity:
+        return
+    print(f'rotating identity {driver.identity} -> {identity["id"]}')
+    driver.identity = identity['id']
+    if identity.get('user_agent'):
+        driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': identity['user_agent']})
+    driver.delete_all_cookies()
+    driver.get('https://www.zhaopin.com/')
+    apply_cookies(driver, identity.get('cookie'), domain='.zhaopin.com')
+
+
+def report_identity(driver, blocked):
+    identity = getattr(driver, 'identity', None)
+    if FINGERPRINT_POOL is None or identity is None:
+        return
+    FINGERPRINT_POOL.report(identity, blocked)
+    if blocked:
+        rotate_identity(driver)
+
+
+def report_outcome(driver, url, outcome):
+    # outcome: 'ok', 'empty' (no jobs on a search page) or 'blocked' (security verification page).
+    if RATE_LIMITER is not None:
+        if outcome == 'blocked':
+            RATE_LIMITER.blocked(url)
+        elif outcome == 'empty':
+            RATE_LIMITER.empty(url)
+        else:
+            RATE_LIMITER.success(url)
+    if outcome != 'empty':
+        report_identity(driver, outcome == 'blocked')
+
+
+def run_serial(args, fingerprint, skill_lib, db):
+    known_urls = load_known(args, db)
+    store, key, done_pages, pending = start_checkpoint(args, 'inline')
+    driver = open_session(fingerprint)
+    try:
+        seen_urls = set(pending)
+
+        for job_url, item in pending.items():
+            final = finalize_record(
+                item,
+                driver=driver,
+                keyword=args.key,
+                skill_lib=skill_lib,
+                wait_seconds=args.detail_wait,
+            )
+            save_to_mysql(db, [final], partial(store.detail_done, key, job_url))
+
+        paginator = open_paginator(args, args.pages)
+        for page in range(1, args.pages + 1):
+            if page in done_pages:
+                continue
+            url = build_search_url(args.base_url, page)
+            stats = page_stats()
+            records = get_data(
+                driver,
+                url,
+                seen_urls=seen_urls,
+                keyword=args.key,
+                skill_lib=skill_lib,
+                detail_wait=args.detail_wait,
+                page_wait=args.page_wait,
+                known_urls=known_urls,
+                stats=stats,
+            )
+            saved, touched = save_page(db, records, known_urls, partial(store.mark_page_done, key, page))
+            print(f'page {page} saved {saved} records, touched {touched} known')
+            if not paginator.record(page, **stats):
+                break
+        print(f'pagination: {paginator.summary()}')
+    finally:
+        close_driver(driver)
+
+
+def create_enrichment_pool(args, fingerprint, skill_lib, db, totals, first_index=0):
+    limiter = RateLimiter(args.enrich_rate)
+    lock = threading.Lock()
+    pool = WorkerPool(args.enrich_workers, lambda index: open_session(fingerprint, first_index + index), close_driver)
+
+    def enrich_task(driver, job_url, title):
+        limiter.wait()
+        skills = enrich_record(driver, job_url, title, args.key, skill_lib, wait_seconds=args.detail_wait)
+        if skills is None:
+            # Left as pending so a later --stage enrich run picks it up again.
+            print(f'enrich skipped {job_url}')
+            with lock:
+                totals['skipped'] += 1
+            return
+        db.run(update_record_skills, job_url, skills)
+        with lock:
+            totals['enriched'] += 1
+        print(f'enriched {job_url} skills={len(skills)}')
+
+    def enqueue(job_url, title):
+        pool.submit(enrich_task, job_url, title)
+
+    return pool, enqueue
+
+
+def finish_listing_page(store, key, page, pending, on_pending=None):
+    store.mark_page_done(key, page)
+    if on_pending:
+        for job_url, title in pending:
+            on_pending(job_url, title)
+
+
+def run_listing(args, fingerprint, skill_lib, db, on_pending=None):
+    known_urls = load_known(args, db)
+    store, key, done_pages, _pending = start_checkpoint(args, 'list')
+    driver = open_session(fingerprint)
+    try:
+        seen_urls = set()
+
+        paginator = open_paginator(args, args.pages)
+        for page in range(1, args.pages + 1):
+            if page in done_pages:
+                continue
+            url = build_search_url(args.base_url, page)
+            stats = page_stats()
+            records = get_data(
+                driver,
+                url,
+                seen_urls=seen_urls,
+                keyword=args.key,
+                skill_lib=skill_lib,
+                with_detail=False,
+                page_wait=args.page_wait,
+                known_urls=known_urls,
+                stats=stats,
             )
+            pending = [(record['job_url'], record['title']) for record in records if record['skills'] == '[]']
+            # Enrichment only starts once the listing rows are committed, or its UPDATE would miss them.
+            on_commit = partial(finish_listing_page, store, key, page, pending, on_pending)
+            saved, touched = save_page(db, records, known_urls, on_commit)
+            print(f'page {page} listed {saved} records, touched {touched} known')
+            if not paginator.record(page, **stats):
+                break
+        print(f'pagination: {paginator.summary()}')
+
+        if JOB_WRITER is not None:
+            # Deliver the last pages' pending details before the enrichment pool shuts down.
+            JOB_WRITER.flush()
+    finally:
+        close_driver(driver)
+
+
+def run_enrichment(args, fingerprint, skill_lib, db):
+    totals = {'enriched': 0, 'skipped': 0}
+    rows = db.run(load_pending_details, limit=args.enrich_limit)
+    print(f'loaded {len(rows)} pending detail pages')
+
+    pool, enqueue = create_enrichment_pool(args, fingerprint, skill_lib, db, totals)
+    for job_url, title in rows:
+        enqueue(job_url, title)
+    pool.start()
+    pool.join()
+    print(f'enrich done: enriched={totals["enriched"]}, skipped={totals["skipped"]}')
+
+
+def run_pipeline(args, fingerprint, skill_lib, db):
+    totals = {'enriched': 0, 'skipped': 0}
+
+    # The listing browser takes session slot 0.
+    pool, enqueue = create_enrichment_pool(args, fingerprint, skill_lib, db, totals, first_index=1)
+    pool.start()
+    try:
+        run_listing(args, fingerprint, skill_lib, db, on_pending=enqueue)
+    finally:
+        pool.join()
+    print(f'enrich done: enriched={totals["enriched"]}, skipped={totals["skipped"]}')
+
+
+def run_worker_pool(args, fingerprint, skill_lib, db):
+    seen_urls = set()
+    seen_lock = threading.Lock()
+    totals_lock = threading.Lock()
+    totals = {'saved': 0, 'touched': 0}
+    known_urls = load_known(args, db)
+    store, key, done_pages, pending = start_checkpoint(args, 'inline')
+    seen_urls.update(pending)
+
+    paginator = open_paginator(args, args.pages)
+    pool = WorkerPool(args.workers, lambda index: open_session(fingerprint, index), close_driver)
+
+    def detail_task(driver, page, item):
+        final = finalize_record(
+            item,
+            driver=driver,
+            keyword=args.key,
+            skill_lib=skill_lib,
+            with_detail=True,
+            wait_seconds=args.detail_wait,
         )
+        if not final.get('job_url'):
+            return
 
-    with connection.cursor() as cursor:
-        cursor.executemany(sql, values)
-    return len(values)
+        print({'title': final.get('title'), 'company': final.get('company'), 'job_url': final.get('job_url')})
+        saved = save_to_mysql(db, [final], partial(store.detail_done, key, normalize_text(item.get('job_url'))))
+        with totals_lock:
+            totals['saved'] += saved
+
+    def page_task(driver, page, url):
+        # Pages are all queued up front; the ones past the stop page are dropped here.
+        if paginator.skips(page):
+            return
+        stats = page_stats()
+        raw_records = load_search_page(driver, url, page_wait=args.page_wait, stats=stats)
+        queued = {}
+        for item in raw_records:
+            job_url = normalize_text(item.get('job_url'))
+            if not job_url:
+                continue
+            with seen_lock:
+                if job_url in seen_urls:
+                    continue
+                seen_urls.add(job_url)
+            stats['new'] += 1
+            if known_urls is not None and known_urls.check(job_url):
+                continue
+            queued[job_url] = item
+        if known_urls is not None:
+            touched = db.run(touch_jobs, known_urls.take())
+            with totals_lock:
+                totals['touched'] += touched
+
+        # Checkpoint before queueing so a detail can never finish ahead of its pending entry.
+        store.mark_page_done(key, page, queued)
+        for item in queued.values():
+            # Details outrank search pages so finished pages get saved before new ones pile up.
+            pool.submit(detail_task, page, item, priority=0)
+        print(f'page {page} queued {len(queued)} detail pages')
+        paginator.record(page, **stats)
+
+    for item in pending.values():
+        pool.submit(detail_task, 0, item, priority=0)
+    for page in range(1, args.pages + 1):
+        if page in done_pages:
+            continue
+        pool.submit(page_task, page, build_search_url(args.base_url, page), priority=1)
+
+    pool.start()
+    pool.join()
+    print(f'pagination: {paginator.summary()}')
+    print(f'workers={pool.workers} saved {totals["saved"]} records, touched {totals["touched"]} known')
+
+
+class SeleniumFallback:
+    # Shared browser for pages the plain HTTP engine gets a verification page for.
+    def __init__(self, fingerprint, args):
+        self.fingerprint = fingerprint
+        self.args = args
+        self.driver = None
+        self.lock = threading.Lock()
+
+    def session(self):
+        if self.driver is None:
+            self.driver = open_session(self.fingerprint)
+        return self.driver
+
+    def search(self, url, stats=None):
+        with self.lock:
+            return load_search_page(self.session(), url, page_wait=self.args.page_wait, stats=stats)
+
+    def description(self, job_url):
+        with self.lock:
+            return fetch_description(self.session(), job_url, wait_seconds=self.args.detail_wait)
+
+    def close(self):
+        if self.driver is not None:
+            close_driver(self.driver)
+            self.driver = None
+
+
+async def crawl_async(args, fingerprint, skill_lib, db):
+    loop = asyncio.get_running_loop()
+    fallback = SeleniumFallback(fingerprint, args)
+    seen_urls = set()
+    totals = {'saved': 0, 'fallback': 0, 'failed': 0}
+    known_urls = load_known(args, db)
+    store, key, done_pages, _pending = start_checkpoint(args, 'inline')
+    paginator = open_paginator(args, args.pages)
+    page_slots = asyncio.Semaphore(max(1, args.per_host))
+
+    async def load_description(fetcher, item):
+        if item.get('skills_list'):
+            return item
+        job_url = normalize_text(item.get('job_url'))
+        # The sqlite cache blocks, so it runs on the executor like the selenium fallback.
+        description = await loop.run_in_executor(None, cached_description, job_url)
+        if description is not None or OFFLINE:
+            if description:
+                item['description'] = description
+            return item
+
+        html_text = await fetcher.fetch(job_url)
+        if html_text is None:
+            # Already retried with backoff; the job is saved without a description instead.
+            return item
+        if is_security_page(html_text):
+            report_outcome(None, job_url, 'blocked')
+            totals['fallback'] += 1
+            description = await loop.run_in_executor(None, fallback.description, job_url)
+        else:
+            report_outcome(None, job_url, 'ok')
+            description = await loop.run_in_executor(None, cache_detail_page, job_url, html_text)
+        if description:
+            item['description'] = description
+        return item
+
+    async def process_page(fetcher, page):
+        # Every page task starts at once; the slots hand out search pages in page order, and a page
+        # only skips its fetch once an earlier page stopped pagination. Pages already fetched are kept.
+        async with page_slots:
+            if paginator.skips(page):
+                return page, None
+            url = build_search_url(args.base_url, page)
+            html_text = await fetcher.fetch(url)
+        if html_text is None:
+            # Left out of the checkpoint, so --resume picks the page up again.
+            print(f'page {page} failed after retries, skipped')
+            return page, None
+        stats = page_stats()
+        if is_security_page(html_text):
+            report_outcome(None, url, 'blocked')
+            totals['fallback'] += 1
+            raw_records = await loop.run_in_executor(None, fallback.search, url, stats)
+        else:
+            raw_records = extract_jobs_from_initial_state(html_text, stats)
+            stats['listed'] = len(raw_records)
+            report_outcome(None, url, 'ok' if raw_records else 'empty')
+
+        fresh = []
+        for item in raw_records:
+            job_url = normalize_text(item.get('job_url'))
+            if not job_url or job_url in seen_urls:
+                continue
+            seen_urls.add(job_url)
+            stats['new'] += 1
+            if known_urls is not None and known_urls.check(job_url):
+                continue
+            fresh.append(item)
+        paginator.record(page, **stats)
+
+        items = await asyncio.gather(*(load_description(fetcher, item) for item in fresh))
+        records = [
+            finalize_record(item, driver=None, keyword=args.key, skill_lib=skill_lib, with_detail=False)
+            for item in items
+        ]
+        return page, [record for record in records if record.get('job_url')]
+
+    try:
+        async with AsyncFetcher(fingerprint, concurrency=args.concurrency, per_host=args.per_host, limiter=RATE_LIMITER) as fetcher:
+            # Tasks, not bare coroutines: as_completed would start those in set order instead of page order.
+            tasks = [
+                asyncio.ensure_future(process_page(fetcher, page))
+                for page in range(1, args.pages + 1)
+                if page not in done_pages
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                page, records = await next_done
+                if records is None:
+                    continue
+                on_commit = partial(store.mark_page_done, key, page)
+                saved, touched = await loop.run_in_executor(None, save_page, db, records, known_urls, on_commit)
+                totals['saved'] += saved
+                print(f'page {page} saved {saved} records, touched {touched} known')
+        totals['failed'] = fetcher.failures
+    finally:
+        fallback.close()
+
+    print(f'pagination: {paginator.summary()}')
+    print(
+        f'async engine saved {totals["saved"]} records, selenium fallbacks={totals["fallback"]}, '
+        f'failed fetches={totals["failed"]}'
+    )
 
 
 if __name__ == '__main__':
@@ -971,13 +1560,57 @@ if __name__ == '__main__':
     parser.add_argument('--base-url', default=DEFAULT_ZHILIAN_URL, help='Search page URL, supports /p1 page pattern')
     parser.add_argument('--key', default='java', help='Keyword for fallback skills matching')
     parser.add_argument('--pages', type=int, default=1, help='Number of pages to crawl')
-    parser.add_argument('--detail-wait', type=float, default=2, help='Seconds to wait on job detail page')
+    parser.add_argument('--page-wait', type=float, default=PAGE_WAIT, help='Max seconds to wait for a search page to be ready')
+    parser.add_argument('--detail-wait', type=float, default=DETAIL_WAIT, help='Max seconds to wait for a job detail page to be ready')
     parser.add_argument('--skills-dir', default=SKILLS_DIR, help='Directory for fallback skills json files')
     parser.add_argument('--headless', action='store_true', help='Run chrome in headless mode')
     parser.add_argument('--use-fingerprint', action='store_true', help='Use fingerprint file user-agent/cookie on zhilian')
     parser.add_argument('--fingerprint-file', default=FINGERPRINT_FILE, help='Fingerprint file path')
     parser.add_argument('--cookie', default='', help='Raw cookie string for zhaopin.com')
     parser.add_argument('--user-agent', default='', help='Custom user-agent string')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parallel browser sessions')
+    add_cache_arguments(parser)
+    add_browser_arguments(parser)
+    add_fingerprint_pool_arguments(parser)
+    add_rate_arguments(parser)
+    add_pagination_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_writer_arguments(parser)
+    add_db_arguments(parser)
+    parser.add_argument(
+        '--block-profile',
+        choices=sorted(BLOCK_PROFILES),
+        default='lite',
+        help='lite: skip images/media/fonts/trackers; strict: also CSS; off: load everything',
+    )
+    parser.add_argument(
+        '--capture',
+        choices=['cdp', 'log'],
+        default='cdp',
+        help='cdp: intercept only matching API responses; log: poll the Chrome performance log',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip jobs already stored for this source; only refresh their crawl_date/status',
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['browser', 'async'],
+        default='browser',
+        help='async: fetch search/detail HTML over HTTP, using Chrome only for verification pages',
+    )
+    parser.add_argument('--concurrency', type=int, default=32, help='Max open HTTP requests for --engine async')
+    parser.add_argument('--per-host', type=int, default=8, help='Max concurrent HTTP requests per host for --engine async')
+    parser.add_argument(
+        '--stage',
+        choices=['inline', 'list', 'enrich', 'pipeline'],
+        default='inline',
+        help='inline: detail pages during listing; list/enrich: run one stage; pipeline: both stages concurrently',
+    )
+    parser.add_argument('--enrich-workers', type=int, default=1, help='Browser sessions for the enrichment stage')
+    parser.add_argument('--enrich-rate', type=float, default=0.5, help='Detail pages per second for enrichment, 0 = no limit')
+    parser.add_argument('--enrich-limit', type=int, default=0, help='Max pending rows for --stage enrich, 0 = all')
     args = parser.parse_args()
 
     HEADLESS = bool(args.headless)
@@ -990,34 +1623,55 @@ if __name__ == '__main__':
     if args.user_agent:
         fingerprint['user_agent'] = args.user_agent
     skill_lib = load_skills_library(args.skills_dir)
-
-    driver = create_driver(fingerprint)
-    connection = get_db_connection()
-
+    SKILL_TAGGER = load_tagger(args.skills_dir, COMMON_SKILLS)
+    PAGE_CACHE = open_cache(args)
+    BROWSER_SESSIONS = open_browser_sessions(args)
+    FINGERPRINT_POOL = open_fingerprint_pool(args, 'zhilian')
+    RATE_LIMITER = open_rate_limiter(args)
+    if FINGERPRINT_POOL is not None:
+        # Pooled identities replace the single fingerprint; the HTTP engines use the first worker's.
+        USE_FINGERPRINT = True
+        fingerprint = FINGERPRINT_POOL.acquire(0)
+    OFFLINE = bool(args.offline)
+    NETWORK_CAPTURE = args.capture
+    BLOCK_PROFILE = args.block_profile
+
+    db = open_pool(args, **writer_connect_kwargs(args))
+    JOB_WRITER = open_writer(args, db)
     try:
-        if USE_FINGERPRINT:
-            driver.get('https://www.zhaopin.com/')
-            apply_cookies(driver, fingerprint.get('cookie'), domain='.zhaopin.com')
-
-        seen_urls = set()
-
-        for page in range(1, args.pages + 1):
-            url = build_search_url(args.base_url, page)
-            records = get_data(
-                driver,
-                url,
-                seen_urls=seen_urls,
-                keyword=args.key,
-                skill_lib=skill_lib,
-                detail_wait=args.detail_wait,
-            )
-            saved = save_to_mysql(connection, records)
-            print(f'page {page} saved {saved} records')
-            time.sleep(2)
+        if args.engine == 'async':
+            asyncio.run(crawl_async(args, fingerprint, skill_lib, db))
+        elif args.stage == 'list':
+            run_listing(args, fingerprint, skill_lib, db)
+        elif args.stage == 'enrich':
+            run_enrichment(args, fingerprint, skill_lib, db)
+        elif args.stage == 'pipeline':
+            run_pipeline(args, fingerprint, skill_lib, db)
+        elif args.workers > 1:
+            run_worker_pool(args, fingerprint, skill_lib, db)
+        else:
+            run_serial(args, fingerprint, skill_lib, db)
     finally:
-        driver.quit()
-        connection.close()
-
-
-
-
+        if JOB_WRITER is not None:
+            JOB_WRITER.close()
+            print(JOB_WRITER.summary())
+        db.close()
+        print(db.summary())
+        if PAGE_CACHE is not None:
+            print(PAGE_CACHE.summary())
+            PAGE_CACHE.close()
+        if BROWSER_SESSIONS is not None:
+            print(BROWSER_SESSIONS.summary())
+        if FINGERPRINT_POOL is not None:
+            FINGERPRINT_POOL.close()
+            print(FINGERPRINT_POOL.summary())
+        print(RATE_LIMITER.summary())
+        wait_summary = WAIT_STATS.summary()
+        if wait_summary:
+            print(wait_summary)
+        transfer_summary = TRANSFER_STATS.summary(BLOCK_PROFILE)
+        if transfer_summary:
+            print(transfer_summary)
+        for locator in (INITIAL_STATE_LOCATOR, RESPONSE_LOCATOR):
+            if locator.cached or locator.scans:
+                print(locator.summary())
@@ -0,0 +1,98 @@
+import json
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+SEARCH_API = 'https://api-c.liepin.com/api/com.liepin.searchfront4c.pc-search-job'
+
+SEARCH_FORM_DEFAULTS = {
+    'city': '410',
+    'dq': '410',
+    'pubTime': '',
+    'currentPage': 0,
+    'pageSize': 40,
+    'key': '',
+    'suggestTag': '',
+    'workYearCode': '0',
+    'compId': '',
+    'compName': '',
+    'compTag': '',
+    'industry': '',
+    'salary': '',
+    'jobKind': '',
+    'compScale': '',
+    'compKind': '',
+    'compStage': '',
+    'eduLevel': '',
+}
+
+
+def create_session(fingerprint, pool_size=4):
+    if requests is None:
+        raise RuntimeError('Missing dependency: requests. Install via pip install requests')
+
+    session = requests.Session()
+    # One keep-alive connection pool per host, reused across every page of the run.
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers.update({
+        'Accept': 'application/json, text/plain, */*',
+        'Content-Type': 'application/json;charset=UTF-8',
+        'Origin': 'https://www.liepin.com',
+        'Referer': 'https://www.liepin.com/',
+        'X-Client-Type': 'web',
+        'X-Fscp-Version': '1',
+        'X-Fscp-Std-Info': '{"client_id": "40108"}',
+        'X-Requested-With': 'XMLHttpRequest',
+    })
+    apply_fingerprint(session, fingerprint)
+    return session
+
+
+def apply_fingerprint(session, fingerprint):
+    # Also used to swap identities on a live session when the fingerprint pool rotates.
+    for header, key in (('User-Agent', 'user_agent'), ('Cookie', 'cookie'), ('X-XSRF-TOKEN', 'xsrf_token')):
+        if fingerprint.get(key):
+            session.headers[header] = fingerprint[key]
+        elif header != 'User-Agent':
+            session.headers.pop(header, None)
+
+
+def build_search_payload(search_url):
+    # Mirrors the form the search page posts, taking filters from the same URL the browser engine opens.
+    params = {key: values[-1] for key, values in parse_qs(urlparse(search_url).query).items()}
+    form = dict(SEARCH_FORM_DEFAULTS)
+    for key in form:
+        if key in params:
+            form[key] = params[key]
+    if 'city' in params and 'dq' not in params:
+        form['dq'] = params['city']
+    form['currentPage'] = int(form['currentPage'] or 0)
+    form['pageSize'] = int(form['pageSize'] or 40)
+
+    return {
+        'data': {
+            'mainSearchPcConditionForm': form,
+            'passThroughForm': {
+                'scene': 'page',
+                'skId': '',
+                'fkId': '',
+                'ckId': uuid.uuid4().hex,
+                'sfrom': 'search_job_pc',
+            },
+        }
+    }
+
+
+def search_jobs(session, search_url, api_url=SEARCH_API, timeout=15):
+    payload = build_search_payload(search_url)
+    response = session.post(api_url, data=json.dumps(payload, ensure_ascii=False).encode('utf-8'), timeout=timeout)
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_FILE = '.page_cache.sqlite3'
+DEFAULT_TTL_HOURS = 168
+DEFAULT_MAX_MB = 1024
+EVICT_EVERY = 200
+
+
+class PageCache:
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl_hours=DEFAULT_TTL_HOURS, max_mb=DEFAULT_MAX_MB):
+        self.path = path
+        self.ttl = ttl_hours * 3600 if ttl_hours and ttl_hours > 0 else 0
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb and max_mb > 0 else 0
+        self.lock = threading.Lock()
+        self.puts = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, size INTEGER NOT NULL, body BLOB NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at)')
+        self.conn.commit()
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute('SELECT fetched_at, body FROM pages WHERE url=?', (url,)).fetchone()
+            if row is None or (self.ttl and time.time() - row[0] > self.ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return zlib.decompress(row[1]).decode('utf-8')
+
+    def put(self, url, page_source):
+        if not page_source:
+            return
+        body = zlib.compress(page_source.encode('utf-8'), 6)
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, fetched_at, size, body) VALUES (?, ?, ?, ?)',
+                (url, time.time(), len(body), body),
+            )
+            self.conn.commit()
+            self.puts += 1
+            if self.puts % EVICT_EVERY == 0:
+                self._evict()
+
+    def evict(self):
+        with self.lock:
+            return self._evict()
+
+    def _evict(self):
+        removed = 0
+        if self.ttl:
+            removed += self.conn.execute('DELETE FROM pages WHERE fetched_at < ?', (time.time() - self.ttl,)).rowcount
+
+        if self.max_bytes:
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+            excess = total - self.max_bytes
+            if excess > 0:
+                # Oldest pages go first until the store fits again.
+                urls = []
+                for url, size in self.conn.execute('SELECT url, size FROM pages ORDER BY fetched_at ASC'):
+                    urls.append((url,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self.conn.executemany('DELETE FROM pages WHERE url=?', urls)
+                removed += len(urls)
+
+        self.conn.commit()
+        return removed
+
+    def summary(self):
+        return f'page cache {self.path}: hits={self.hits} misses={self.misses} stored={self.puts}'
+
+    def close(self):
+        with self.lock:
+            self._evict()
+            self.conn.close()
+
+
+def add_cache_arguments(parser):
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_FILE, default='', help='Cache detail pages in this SQLite file')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_HOURS, help='Hours before a cached page expires, 0 = never')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help='Evict oldest pages above this size, 0 = unbounded')
+    parser.add_argument('--offline', action='store_true', help='Only read detail pages from --cache, never hit the network')
+
+
+def open_cache(args):
+    if args.offline and not args.cache:
+        args.cache = DEFAULT_CACHE_FILE
+    if not args.cache:
+        return None
+    return PageCache(args.cache, ttl_hours=args.cache_ttl, max_mb=args.cache_max_mb)
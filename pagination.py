@@ -0,0 +1,136 @@
+import threading
+
+# Where the search responses report their result size; the first match closest to the root wins.
+TOTAL_KEYS = ('totalCounts', 'totalCount', 'numFound', 'numTotal', 'total')
+PAGE_COUNT_KEYS = ('totalPage', 'totalPages', 'pageCount', 'pages')
+SEARCH_DEPTH = 4
+DEFAULT_MIN_NEW_RATIO = 0.1
+DEFAULT_MAX_EMPTY = 2
+
+
+def find_totals(tree, max_depth=SEARCH_DEPTH):
+    # Breadth-first so a top-level "count" beats one nested inside a job card; within a level the
+    # more specific key wins.
+    total = None
+    pages = None
+    level = [tree]
+    for _ in range(max_depth):
+        nodes = [node for node in level if isinstance(node, dict)]
+        if not nodes:
+            break
+        if total is None:
+            total = first_count(nodes, TOTAL_KEYS, minimum=0)
+        if pages is None:
+            pages = first_count(nodes, PAGE_COUNT_KEYS, minimum=1)
+        if total is not None and pages is not None:
+            break
+        level = [value for node in nodes for value in node.values() if isinstance(value, dict)]
+    return total, pages
+
+
+def first_count(nodes, keys, minimum):
+    for key in keys:
+        for node in nodes:
+            value = node.get(key)
+            if isinstance(value, int) and not isinstance(value, bool) and value >= minimum:
+                return value
+    return None
+
+
+def page_stats():
+    # Filled in by the page loaders: jobs listed, jobs new to this run, and what the site reports.
+    return {'listed': 0, 'new': 0, 'total': None, 'total_pages': None, 'blocked': False}
+
+
+class Paginator:
+    # Decides after each page whether a query is worth another one. Stops when:
+    #   - fewer than min_new_ratio of the listed jobs were new to this run (pages repeating),
+    #   - the site's reported total (or page count) has been paged through,
+    #   - max_empty consecutive pages listed nothing,
+    #   - max_pages is reached.
+    # "new" means not seen earlier in this run; jobs already in the database still count as new
+    # here, since --incremental runs page through them to refresh crawl_date.
+    # Pages may be recorded out of order (worker pool, async engine): a stop only rules out the
+    # pages after stop_page, so pages below it that finish later are still kept.
+    def __init__(self, max_pages, min_new_ratio=DEFAULT_MIN_NEW_RATIO, max_empty=DEFAULT_MAX_EMPTY):
+        self.max_pages = max_pages
+        self.min_new_ratio = min_new_ratio
+        self.max_empty = max_empty
+        self.lock = threading.Lock()
+        self.page_size = 0
+        self.total = None
+        self.total_pages = None
+        self.empty_pages = set()
+        self.listed = 0
+        self.new = 0
+        self.pages = 0
+        self.stop_reason = ''
+        self.stop_page = None
+
+    @property
+    def stopped(self):
+        return bool(self.stop_reason)
+
+    def skips(self, page):
+        with self.lock:
+            return self.stop_page is not None and page > self.stop_page
+
+    def record(self, page, listed, new, total=None, total_pages=None, blocked=False):
+        with self.lock:
+            self.pages += 1
+            self.listed += listed
+            self.new += new
+            self.page_size = max(self.page_size, listed)
+            # A total below what this very page listed is some other counter, not the result size.
+            if total is not None and total >= listed:
+                self.total = total
+            if total_pages is not None:
+                self.total_pages = total_pages
+
+            reason = self._stop_reason(page, listed, new, blocked)
+            if reason and (self.stop_page is None or page < self.stop_page):
+                self.stop_reason = reason
+                self.stop_page = page
+            return not self.stop_reason
+
+    def _stop_reason(self, page, listed, new, blocked):
+        # A security page says nothing about the result set, so only the page limit applies to it.
+        if listed == 0 and not blocked:
+            self.empty_pages.add(page)
+            streak = 1
+            while page - streak in self.empty_pages:
+                streak += 1
+            if self.max_empty and streak >= self.max_empty:
+                return f'{streak} empty pages'
+        elif listed and self.min_new_ratio and new / listed < self.min_new_ratio:
+            return f'only {new}/{listed} new on page {page}'
+
+        if self.total_pages is not None and page >= self.total_pages:
+            return f'last page of {self.total_pages}'
+        if self.total is not None and self.page_size and page * self.page_size >= self.total:
+            return f'reported total {self.total} reached'
+        if page >= self.max_pages:
+            return 'page limit'
+        return ''
+
+    def summary(self):
+        return f'pages={self.pages} listed={self.listed} new={self.new} ({self.stop_reason or "running"})'
+
+
+def add_pagination_arguments(parser):
+    parser.add_argument(
+        '--min-new-ratio',
+        type=float,
+        default=DEFAULT_MIN_NEW_RATIO,
+        help='Stop paging once a page has fewer new jobs than this share, 0 = never',
+    )
+    parser.add_argument(
+        '--max-empty-pages',
+        type=int,
+        default=DEFAULT_MAX_EMPTY,
+        help='Stop paging after this many empty pages in a row, 0 = never',
+    )
+
+
+def open_paginator(args, max_pages):
+    return Paginator(max_pages, min_new_ratio=args.min_new_ratio, max_empty=args.max_empty_pages)
@@ -0,0 +1,128 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        # rate is requests per second shared by every caller; <= 0 disables limiting.
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_at)
+            self.next_at = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def host_key(url):
+    host = (urlparse(url).hostname or url) if '://' in url else url
+    return host[4:] if host.startswith('www.') else host
+
+
+class HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.successes = 0
+        self.blocks = 0
+        self.empties = 0
+
+    def reserve(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # A negative balance is the queue of callers ahead; each waits for its own token.
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class AdaptiveRateLimiter:
+    # One token bucket per host, shared by every worker. Clean responses add `increase` req/s
+    # (additive increase); a security page or 403 multiplies the rate by `decrease` and drains the
+    # bucket (multiplicative decrease), an empty result page by the milder `empty_decrease`.
+    def __init__(self, rate=0.5, min_rate=0.05, max_rate=2.0, burst=1.0, increase=0.02, decrease=0.5,
+                 empty_decrease=0.8, host_rates=None):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.empty_decrease = empty_decrease
+        self.host_rates = dict(host_rates or {})
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def _bucket(self, url):
+        key = host_key(url)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = HostBucket(self.host_rates.get(key, self.initial_rate), self.burst)
+        return bucket
+
+    def reserve(self, url):
+        # Seconds the caller must wait before its request; async callers sleep on it themselves.
+        if self.initial_rate <= 0:
+            return 0.0
+        with self.lock:
+            return self._bucket(url).reserve(time.monotonic())
+
+    def ready_in(self, url):
+        # Seconds until the host has a free token, without taking it; used to pick the least busy host.
+        if self.initial_rate <= 0:
+            return 0.0
+        with self.lock:
+            bucket = self._bucket(url)
+            tokens = min(bucket.burst, bucket.tokens + (time.monotonic() - bucket.updated) * bucket.rate)
+            return 0.0 if tokens >= 1 else (1 - tokens) / bucket.rate
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def success(self, url):
+        with self.lock:
+            bucket = self._bucket(url)
+            bucket.successes += 1
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def blocked(self, url):
+        with self.lock:
+            bucket = self._bucket(url)
+            bucket.blocks += 1
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+
+    def empty(self, url):
+        with self.lock:
+            bucket = self._bucket(url)
+            bucket.empties += 1
+            bucket.rate = max(self.min_rate, bucket.rate * self.empty_decrease)
+
+    def summary(self):
+        with self.lock:
+            parts = [
+                f'{key} {bucket.rate:.2f}/s ok={bucket.successes} blocked={bucket.blocks} empty={bucket.empties}'
+                for key, bucket in sorted(self.buckets.items())
+            ]
+        return 'rate limiter: ' + ('; '.join(parts) if parts else 'no requests')
+
+
+def add_rate_arguments(parser, rate=0.5):
+    parser.add_argument('--rate', type=float, default=rate, help='Starting requests per second per host, 0 = no pacing')
+    parser.add_argument('--min-rate', type=float, default=0.05, help='Floor the rate backs off to after security pages')
+    parser.add_argument('--max-rate', type=float, default=2.0, help='Ceiling the rate climbs to while responses stay clean')
+
+
+def open_rate_limiter(args):
+    return AdaptiveRateLimiter(rate=args.rate, min_rate=args.min_rate, max_rate=args.max_rate)
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+POLL_INTERVAL = 0.2
+
+SELECTOR_READY_JS = '''
+var selectors = arguments[0], texts = arguments[1];
+for (var i = 0; i < selectors.length; i++) {
+    var node = document.querySelector(selectors[i]);
+    if (node && node.textContent.trim()) return true;
+}
+var body = document.body ? document.body.innerText : '';
+for (var j = 0; j < texts.length; j++) {
+    if (body.indexOf(texts[j]) >= 0) return true;
+}
+return false;
+'''
+
+
+class WaitStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+
+    def record(self, label, elapsed, ready):
+        with self.lock:
+            item = self.items.setdefault(label, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            item['count'] += 1
+            item['total'] += elapsed
+            item['max'] = max(item['max'], elapsed)
+            if not ready:
+                item['timeouts'] += 1
+
+    def summary(self):
+        with self.lock:
+            lines = []
+            for label, item in sorted(self.items.items()):
+                avg = item['total'] / item['count'] if item['count'] else 0
+                lines.append(
+                    f"wait {label}: n={item['count']} avg={avg:.2f}s max={item['max']:.2f}s "
+                    f"timeouts={item['timeouts']}"
+                )
+            return '\n'.join(lines)
+
+
+STATS = WaitStats()
+
+
+def wait_until(check, timeout, label='wait', poll=POLL_INTERVAL):
+    start = time.monotonic()
+    while True:
+        try:
+            result = check()
+        except Exception:
+            result = None
+        elapsed = time.monotonic() - start
+        if result:
+            STATS.record(label, elapsed, True)
+            return result
+        if elapsed >= timeout:
+            STATS.record(label, elapsed, False)
+            return None
+        time.sleep(poll)
+
+
+def wait_for_initial_state(driver, timeout, extra_selectors=(), label='initial_state'):
+    # The state blob is an inline script, so it exists as soon as the HTML has been parsed.
+    script = 'return !!window.__INITIAL_STATE__ || arguments[0].some(function (s) { return !!document.querySelector(s); });'
+    return bool(wait_until(lambda: driver.execute_script(script, list(extra_selectors)), timeout, label=label))
+
+
+def wait_for_selector(driver, selectors, timeout, texts=(), label='selector'):
+    return bool(
+        wait_until(
+            lambda: driver.execute_script(SELECTOR_READY_JS, list(selectors), list(texts)),
+            timeout,
+            label=label,
+        )
+    )
+
+
+def wait_for_response(driver, url_pattern, timeout, label='response'):
+    # Drains the performance log while waiting and hands every entry back, since
+    # get_log('performance') only returns each entry once.
+    messages = []
+    pending = set()
+    finished = set()
+
+    def check():
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            messages.append(message)
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                if url_pattern in params.get('response', {}).get('url', ''):
+                    pending.add(params.get('requestId'))
+            elif method == 'Network.loadingFinished':
+                finished.add(params.get('requestId'))
+        return bool(pending & finished)
+
+    wait_until(check, timeout, label=label)
+    return messages
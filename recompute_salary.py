@@ -0,0 +1,117 @@
+import argparse
+import time
+
+from db import add_db_arguments, open_pool
+from job_writer import HASH_COLUMNS, content_hash
+from salary import parse_salary_series
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+SALARY_COLUMNS = ('salary_min', 'salary_max', 'salary_avg')
+
+
+def load_salary_chunk(connection, after_id, chunk_size=20000, source=None):
+    sql = 'SELECT id, salary, salary_min, salary_max, salary_avg FROM jobs WHERE id > %s'
+    params = [after_id]
+    if source:
+        sql += ' AND source=%s'
+        params.append(source)
+    sql += ' ORDER BY id ASC LIMIT %s'
+    params.append(chunk_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def changed_rows(rows):
+    frame = pd.DataFrame(rows, columns=['id', 'salary'] + list(SALARY_COLUMNS))
+    # Unparseable salaries are stored as 0, same as the crawlers do.
+    fresh = parse_salary_series(frame['salary']).fillna(0.0)
+    stored = frame[list(SALARY_COLUMNS)].astype(float)
+    diff = (fresh - stored).abs().max(axis=1) >= 0.005
+    return list(zip(frame.loc[diff, 'id'].tolist(), *(fresh.loc[diff, column].tolist() for column in SALARY_COLUMNS)))
+
+
+def update_salaries(connection, items):
+    # The salary columns are part of content_hash, so the hashes are recomputed from the locked rows
+    # and written by the same UPDATE.
+    if not items:
+        return 0
+    salaries = {item[0]: dict(zip(SALARY_COLUMNS, item[1:])) for item in items}
+    placeholders = ', '.join(['%s'] * len(salaries))
+    select_sql = f"SELECT id, {', '.join(HASH_COLUMNS)} FROM jobs WHERE id IN ({placeholders}) FOR UPDATE"
+    connection.begin()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(select_sql, list(salaries))
+            hashes = {}
+            for row in cursor.fetchall():
+                item = dict(zip(HASH_COLUMNS, row[1:]))
+                item.update(salaries[row[0]])
+                hashes[row[0]] = content_hash(item)
+            if not hashes:
+                connection.commit()
+                return 0
+            cases = ' '.join(['WHEN %s THEN %s'] * len(hashes))
+            assignments = [f'{column}=CASE id {cases} END' for column in SALARY_COLUMNS + ('content_hash',)]
+            params = []
+            for column in SALARY_COLUMNS:
+                for job_id in hashes:
+                    params.extend([job_id, salaries[job_id][column]])
+            for job_id, row_hash in hashes.items():
+                params.extend([job_id, row_hash])
+            sql = (
+                f"UPDATE jobs SET {', '.join(assignments)}, updated_at=CURRENT_TIMESTAMP "
+                f"WHERE id IN ({', '.join(['%s'] * len(hashes))})"
+            )
+            updated = cursor.execute(sql, params + list(hashes))
+        connection.commit()
+        return updated
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute salary_min/max/avg for the whole jobs table after parser changes')
+    parser.add_argument('--chunk-size', type=int, default=20000, help='Rows read per keyset page')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per batched UPDATE')
+    parser.add_argument('--source', default='', help='Only recompute this source, e.g. zhilian or liepin')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change')
+    add_db_arguments(parser)
+    args = parser.parse_args()
+
+    if pd is None:
+        raise RuntimeError('Missing dependency: pandas. Install via pip install pandas')
+
+    db = open_pool(args)
+    started = time.perf_counter()
+    scanned = 0
+    changed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.run(load_salary_chunk, last_id, chunk_size=args.chunk_size, source=args.source)
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            items = changed_rows(rows)
+            changed += len(items)
+            if not args.dry_run:
+                for start in range(0, len(items), args.batch_size):
+                    db.run(update_salaries, items[start:start + args.batch_size])
+            print(f'scanned {scanned} rows up to id={last_id}, changed {changed}')
+    finally:
+        db.close()
+
+    action = 'would change' if args.dry_run else 'updated'
+    print(f'done: scanned={scanned}, {action}={changed} in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import math
+import re
+from functools import lru_cache
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+# Everything is normalised to thousand CNY per month, the unit the jobs table has always used.
+UNIT_FACTORS = {'万': 10.0, 'w': 10.0, 'W': 10.0, '千': 1.0, 'k': 1.0, 'K': 1.0, '元': 0.001}
+WORK_DAYS_PER_MONTH = 21.75
+WORK_HOURS_PER_DAY = 8
+PERIOD_FACTORS = {
+    'month': 1.0,
+    'year': 1 / 12,
+    'day': WORK_DAYS_PER_MONTH,
+    'hour': WORK_DAYS_PER_MONTH * WORK_HOURS_PER_DAY,
+}
+
+BONUS_PATTERN = re.compile(r'[·•]?(\d{1,2})薪')
+# Each bound keeps its own unit, so "8千-1.2万" is 8-12 rather than 80-120 or 8-1.2.
+RANGE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(万|千|[kKwW]|元)?(?:[-~～—至到](\d+(?:\.\d+)?)(万|千|[kKwW]|元)?)?')
+HOUR_PATTERN = re.compile(r'时')
+DAY_PATTERN = re.compile(r'[天日]')
+YEAR_PATTERN = re.compile(r'年')
+SPACE_PATTERN = re.compile(r'\s+')
+NEGOTIABLE = '面议'
+EMPTY = (None, None, None)
+
+
+def salary_period(text):
+    if HOUR_PATTERN.search(text):
+        return 'hour'
+    if DAY_PATTERN.search(text):
+        return 'day'
+    if YEAR_PATTERN.search(text):
+        return 'year'
+    return 'month'
+
+
+def default_unit(value, period):
+    # Bare numbers: day/hour rates and anything in the hundreds are yuan ("8000-12000"), the rest is k.
+    return '元' if period in ('day', 'hour') or value >= 100 else 'k'
+
+
+def round2(value):
+    # Half-up on the binary value, written so NumPy reproduces it exactly in parse_salary_series.
+    return math.floor(value * 100 + 0.5) / 100
+
+
+def parse_salary(salary_text):
+    if not salary_text:
+        return EMPTY
+    return _parse_salary(SPACE_PATTERN.sub('', str(salary_text)))
+
+
+@lru_cache(maxsize=65536)
+def _parse_salary(text):
+    if not text or NEGOTIABLE in text:
+        return EMPTY
+
+    months = 12
+    bonus = BONUS_PATTERN.search(text)
+    if bonus:
+        months = int(bonus.group(1))
+        text = BONUS_PATTERN.sub('', text)
+
+    match = RANGE_PATTERN.search(text)
+    if not match:
+        return EMPTY
+    low, low_unit, high, high_unit = match.groups()
+    low = float(low)
+    high = float(high) if high else low
+    period = salary_period(text)
+
+    low_unit = low_unit or high_unit
+    high_unit = high_unit or low_unit
+    if low_unit is None:
+        low_unit = high_unit = default_unit(high, period)
+
+    # "·13薪" is spread over the year; a yearly figure already includes it.
+    factor = PERIOD_FACTORS[period] * (1.0 if period == 'year' else months / 12)
+    min_value = low * UNIT_FACTORS[low_unit] * factor
+    max_value = high * UNIT_FACTORS[high_unit] * factor
+    avg_value = (min_value + max_value) / 2
+    return round2(min_value), round2(max_value), round2(avg_value)
+
+
+def parse_salary_series(series):
+    # Column-at-a-time version of parse_salary for recomputing the whole table; same rules,
+    # evaluated with pandas string ops and NumPy arithmetic. Unparseable rows come back as NaN.
+    if pd is None:
+        raise RuntimeError('Missing dependency: pandas. Install via pip install pandas')
+
+    text = series.fillna('').astype(str).str.replace(SPACE_PATTERN.pattern, '', regex=True)
+    months = pd.to_numeric(text.str.extract(BONUS_PATTERN.pattern, expand=False)).fillna(12.0)
+    body = text.str.replace(BONUS_PATTERN.pattern, '', regex=True)
+    parts = body.str.extract(RANGE_PATTERN.pattern)
+
+    low = pd.to_numeric(parts[0])
+    high = pd.to_numeric(parts[2]).fillna(low)
+    period = pd.Series(
+        np.select(
+            [
+                body.str.contains(HOUR_PATTERN.pattern, regex=True),
+                body.str.contains(DAY_PATTERN.pattern, regex=True),
+                body.str.contains(YEAR_PATTERN.pattern, regex=True),
+            ],
+            ['hour', 'day', 'year'],
+            'month',
+        ),
+        index=series.index,
+    )
+    fallback = pd.Series(np.where(period.isin(['day', 'hour']) | (high >= 100), '元', 'k'), index=series.index)
+    low_unit = parts[1].fillna(parts[3]).fillna(fallback)
+    high_unit = parts[3].fillna(parts[1]).fillna(fallback)
+
+    factor = period.map(PERIOD_FACTORS) * np.where(period == 'year', 1.0, months / 12)
+    min_value = low * low_unit.map(UNIT_FACTORS) * factor
+    max_value = high * high_unit.map(UNIT_FACTORS) * factor
+    avg_value = (min_value + max_value) / 2
+
+    invalid = text.str.contains(NEGOTIABLE, regex=False) | low.isna()
+    result = pd.DataFrame({'salary_min': min_value, 'salary_max': max_value, 'salary_avg': avg_value})
+    return (np.floor(result * 100 + 0.5) / 100).mask(invalid)
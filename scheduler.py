@@ -0,0 +1,144 @@
+import heapq
+import itertools
+import json
+import threading
+from dataclasses import dataclass, field
+
+from pagination import Paginator
+
+SOURCES = ('zhilian', 'liepin')
+DEFAULT_PAGES = 10
+DEFAULT_PRIORITY = 10
+
+
+@dataclass
+class CrawlQuery:
+    source: str
+    keyword: str
+    city: str
+    pages: int = DEFAULT_PAGES
+    priority: int = DEFAULT_PRIORITY
+    city_name: str = ''
+    start_page: int = 1
+    crawled: int = 0
+    new_urls: int = 0
+    stop_reason: str = ''
+    paginator: Paginator = field(default=None, repr=False)
+
+    @property
+    def label(self):
+        return f'{self.source}:{self.city_name or self.city}:{self.keyword}'
+
+
+def load_spec(path):
+    # {"cities": {"上海": {"zhilian": "538", "liepin": "020"}},
+    #  "defaults": {"pages": 10, "priority": 10, "sources": ["zhilian", "liepin"]},
+    #  "jobs": [{"keywords": ["python", "go"], "cities": ["上海"], "pages": 20, "priority": 1}]}
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        spec = json.load(f)
+
+    cities = spec.get('cities', {})
+    defaults = spec.get('defaults', {})
+    queries = []
+    seen = set()
+    for job in spec.get('jobs', []):
+        sources = job.get('sources', defaults.get('sources', SOURCES))
+        for source in sources:
+            if source not in SOURCES:
+                raise ValueError(f'Unknown source {source!r} in {path}, expected one of {", ".join(SOURCES)}')
+        for keyword in job.get('keywords', []):
+            for city_name in job.get('cities', defaults.get('cities', [])):
+                for source in sources:
+                    # A city is either a name from "cities" or a raw site code used for every source.
+                    codes = cities.get(city_name)
+                    city = codes.get(source) if isinstance(codes, dict) else city_name
+                    if not city:
+                        print(f'spec: no {source} code for city {city_name!r}, skipped')
+                        continue
+                    key = (source, keyword, str(city))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    queries.append(CrawlQuery(
+                        source=source,
+                        keyword=keyword,
+                        city=str(city),
+                        pages=int(job.get('pages', defaults.get('pages', DEFAULT_PAGES))),
+                        priority=int(job.get('priority', defaults.get('priority', DEFAULT_PRIORITY))),
+                        city_name=city_name if isinstance(codes, dict) else '',
+                    ))
+    return queries
+
+
+class CrawlScheduler:
+    # Page tasks live in one heap per source, ordered by (priority, page), so every keyword's page 1
+    # runs before anyone's page 2. A query only queues its next page once the current one finished
+    # and its paginator wants another, which lets narrow keywords stop early. get() hands a worker
+    # the source whose host gets a rate-limit token soonest, so a throttled site does not hold up
+    # the other one.
+    def __init__(self, queries, url_for, limiter=None, paginator=Paginator):
+        self.queries = list(queries)
+        self.url_for = url_for
+        self.limiter = limiter
+        self.heaps = {source: [] for source in SOURCES}
+        self.counter = itertools.count()
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        for query in self.queries:
+            query.paginator = paginator(query.pages)
+            if query.start_page > query.pages:
+                query.stop_reason = 'already done'
+                continue
+            self._push(query, query.start_page)
+
+    def _push(self, query, page):
+        heapq.heappush(self.heaps[query.source], (query.priority, page, next(self.counter), query))
+
+    def _pick_source(self):
+        best = None
+        for source, heap in self.heaps.items():
+            if not heap:
+                continue
+            priority, page, _seq, query = heap[0]
+            wait = self.limiter.ready_in(self.url_for(query, page)) if self.limiter is not None else 0.0
+            rank = (wait, priority, page)
+            if best is None or rank < best[0]:
+                best = (rank, source)
+        return best[1] if best else None
+
+    def get(self):
+        # Blocks while other workers may still queue follow-up pages; None means the run is over.
+        with self.cond:
+            while True:
+                source = self._pick_source()
+                if source is not None:
+                    _priority, page, _seq, query = heapq.heappop(self.heaps[source])
+                    self.in_flight += 1
+                    return query, page
+                if self.in_flight == 0:
+                    return None
+                self.cond.wait()
+
+    def done(self, query, page, stats):
+        # stats: the page_stats() dict the page loader filled in.
+        with self.cond:
+            self.in_flight -= 1
+            query.crawled += 1
+            query.new_urls += stats['new']
+            if query.paginator.record(page, **stats):
+                self._push(query, page + 1)
+            else:
+                query.stop_reason = query.paginator.stop_reason
+            self.cond.notify_all()
+
+    def failed(self, query, page, error):
+        with self.cond:
+            self.in_flight -= 1
+            query.stop_reason = f'page {page} failed: {error}'
+            self.cond.notify_all()
+
+    def summary(self):
+        lines = [f'{len(self.queries)} queries:']
+        for query in sorted(self.queries, key=lambda item: (item.priority, item.label)):
+            lines.append(f'  {query.label}: pages={query.crawled} new={query.new_urls} ({query.stop_reason or "not started"})')
+        return '\n'.join(lines)
@@ -0,0 +1,111 @@
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+ALIASES_FILE = 'aliases.json'
+# An ASCII alias only counts as a whole token: "Go" must not fire inside "Google" or "MongoDB",
+# "Java" not inside "JavaScript", "C" not inside "C++", nothing inside "R&D". CJK neighbours are
+# always a boundary.
+LEFT_BOUNDARY = r'(?<![A-Za-z0-9_&])'
+RIGHT_BOUNDARY = r'(?![A-Za-z0-9_+#&])'
+# Aliases this short ("Go", "Qt", "C#") are plain words or letters in lowercase text ("let us go"),
+# so they only match with the capitalisation written in aliases.json.
+EXACT_CASE_LENGTH = 2
+ASCII_ALIAS = re.compile(r'[A-Za-z0-9#+.]+')
+
+
+def trie_pattern(node):
+    # Alternation factored by common prefix, so the regex engine walks one trie path per position
+    # instead of retrying every alias; children first keeps the longest alias preferred.
+    branches = []
+    for char in sorted(k for k in node if k != ''):
+        branches.append(re.escape(char) + trie_pattern(node[char]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+    body = '(?:' + '|'.join(branches) + ')'
+    return body + '?' if '' in node else body
+
+
+def alias_variants(alias):
+    alias = alias.strip().lower()
+    if not alias:
+        return []
+    variants = [alias]
+    if ' ' in alias:
+        # JD text writes "Spring Boot", "SpringBoot" and "Spring-Boot" interchangeably.
+        variants.append(alias.replace(' ', ''))
+        variants.append(alias.replace(' ', '-'))
+    return variants
+
+
+def exact_case(alias):
+    return len(alias) <= EXACT_CASE_LENGTH and bool(ASCII_ALIAS.fullmatch(alias))
+
+
+class SkillTagger:
+    # Only the listed aliases are compiled; a canonical name is just the label unless it is listed
+    # too ("C" is found through "C语言", never as a bare letter). A skill without aliases (the
+    # COMMON_SKILLS fallback) is matched by its name.
+    def __init__(self, aliases):
+        self.canonical = {}
+        self.exact = {}
+        for name, names in aliases.items():
+            for alias in list(names) or [name]:
+                alias = alias.strip()
+                for variant in alias_variants(alias):
+                    self.canonical.setdefault(variant, name)
+                if exact_case(alias):
+                    self.exact.setdefault(alias.lower(), set()).add(alias)
+
+        trie = {}
+        for alias in self.canonical:
+            node = trie
+            for char in alias:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self.pattern = re.compile(LEFT_BOUNDARY + '(' + trie_pattern(trie) + ')' + RIGHT_BOUNDARY, re.IGNORECASE)
+
+    def tag(self, text, limit=None):
+        found = []
+        seen = set()
+        if not text:
+            return found
+        for match in self.pattern.finditer(text):
+            alias = match.group(1)
+            spellings = self.exact.get(alias.lower())
+            if spellings is not None and alias not in spellings:
+                continue
+            name = self.canonical.get(alias.lower())
+            if name and name not in seen:
+                seen.add(name)
+                found.append(name)
+                if limit and len(found) >= limit:
+                    break
+        return found
+
+    def summary(self):
+        return f'skill tagger: skills={len(set(self.canonical.values()))} aliases={len(self.canonical)}'
+
+
+def load_aliases(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f'{path} must map canonical skill names to alias lists')
+    aliases = {}
+    for name, names in data.items():
+        if isinstance(names, str):
+            names = [names]
+        aliases[str(name)] = [str(alias) for alias in names or []]
+    return aliases
+
+
+@lru_cache(maxsize=8)
+def load_tagger(skills_dir, fallback=()):
+    path = Path(skills_dir) / ALIASES_FILE
+    if path.exists():
+        return SkillTagger(load_aliases(path))
+    return SkillTagger({name: [] for name in fallback})
@@ -0,0 +1,80 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import job
+from liepin_api import build_search_payload
+from pagination import page_stats
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'liepin_search_response.json'
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class FakeSession:
+    # Stands in for the requests session: answers every search POST with the recorded response.
+    def __init__(self, body):
+        self.body = body
+        self.posts = []
+
+    def post(self, url, data=None, timeout=None):
+        self.posts.append((url, json.loads(data)))
+        return FakeResponse(self.body)
+
+
+class LiepinSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(FIXTURE.read_text(encoding='utf-8'))
+        self.url = job.build_search_url(job.LIEPIN_SEARCH_URL, 1, page_size=40, key='java', city='020')
+
+    def test_payload_mirrors_search_url(self):
+        form = build_search_payload(self.url)['data']['mainSearchPcConditionForm']
+        self.assertEqual(form['key'], 'java')
+        self.assertEqual(form['city'], '020')
+        self.assertEqual(form['dq'], '020')
+        self.assertEqual(form['currentPage'], 1)
+        self.assertEqual(form['pageSize'], 40)
+
+    def test_parses_recorded_response(self):
+        stats = page_stats()
+        records = job.get_data_http(self.session, self.url, set(), api_url='http://stub/search', stats=stats)
+
+        self.assertEqual(self.session.posts[0][0], 'http://stub/search')
+        self.assertEqual([record['job_url'] for record in records], [
+            'https://www.liepin.com/a/61234567.shtml',
+            'https://www.liepin.com/job/61234568.shtml',
+        ])
+        first = records[0]
+        self.assertEqual(first['title'], 'Java开发工程师')
+        self.assertEqual(first['company'], '某某科技有限公司')
+        self.assertEqual(first['location'], '上海-浦东新区')
+        self.assertEqual(first['company_nature'], 'B轮')
+        self.assertEqual(first['source'], 'liepin')
+        self.assertEqual(json.loads(first['skills']), ['Java', 'Spring Boot', 'MySQL'])
+        self.assertEqual((first['salary_min'], first['salary_max']), (23.33, 40.83))
+        self.assertEqual((records[1]['salary_min'], records[1]['salary_avg']), (0, 0))
+
+        self.assertEqual(stats['listed'], 3)
+        self.assertEqual(stats['new'], 2)
+        self.assertEqual((stats['total'], stats['total_pages']), (83, 3))
+
+    def test_seen_urls_are_skipped(self):
+        seen = {'https://www.liepin.com/a/61234567.shtml'}
+        records = job.get_data_http(self.session, self.url, seen, api_url='http://stub/search')
+        self.assertEqual([record['job_url'] for record in records], ['https://www.liepin.com/job/61234568.shtml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skill_tagger import SkillTagger, load_tagger
+
+SKILLS_DIR = str(Path(__file__).resolve().parent.parent / 'skills')
+
+
+class SkillTaggerTest(unittest.TestCase):
+    def setUp(self):
+        self.tagger = load_tagger(SKILLS_DIR)
+
+    def test_aliases_map_to_canonical_name(self):
+        self.assertEqual(self.tagger.tag('熟悉Golang，了解C语言和R语言'), ['Go', 'C', 'R'])
+        self.assertEqual(self.tagger.tag('Java/Spring Boot/MySQL'), ['Java', 'Spring Boot', 'MySQL'])
+        self.assertEqual(self.tagger.tag('熟悉Go、C++、C#'), ['Go', 'C++', 'C#'])
+
+    def test_alias_inside_longer_word(self):
+        self.assertEqual(self.tagger.tag('Google'), [])
+        self.assertEqual(self.tagger.tag('MongoDB'), ['MongoDB'])
+        self.assertEqual(self.tagger.tag('JavaScript'), ['JavaScript'])
+
+    def test_bare_letters_are_not_skills(self):
+        self.assertEqual(self.tagger.tag('负责C端产品'), [])
+        self.assertEqual(self.tagger.tag('R&D团队'), [])
+        self.assertEqual(self.tagger.tag('plan A/B/C'), [])
+
+    def test_short_alias_needs_its_capitalisation(self):
+        self.assertEqual(self.tagger.tag('Let us go'), [])
+        self.assertEqual(self.tagger.tag('熟悉Go开发'), ['Go'])
+
+    def test_skill_without_aliases_matches_its_name(self):
+        self.assertEqual(SkillTagger({'Docker': []}).tag('会用docker部署'), ['Docker'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import gzip
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_initial_state import legacy_extract_initial_state
+from job_zhilian import extract_initial_state, extract_jobs_from_initial_state
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'zhilian_search.html.gz'
+
+
+class ZhilianInitialStateTest(unittest.TestCase):
+    def setUp(self):
+        with gzip.open(FIXTURE, 'rt', encoding='utf-8') as f:
+            self.page = f.read()
+
+    def test_matches_legacy_extractor(self):
+        self.assertEqual(extract_initial_state(self.page), legacy_extract_initial_state(self.page))
+
+    def test_parses_search_page(self):
+        stats = {}
+        records = extract_jobs_from_initial_state(self.page, stats)
+
+        self.assertEqual(len(records), 30)
+        self.assertEqual(stats['total'], 1287)
+        first = records[0]
+        self.assertEqual(first['title'], 'Python爬虫工程师')
+        self.assertEqual(first['salary'], '1.2万-2万')
+        self.assertEqual(first['location'], '上海')
+        self.assertEqual(first['skills_list'], ['Python', 'Django', 'MySQL'])
+        self.assertEqual(first['job_url'], 'https://www.zhaopin.com/jobdetail/CC467712782J40000000000.htm')
+        self.assertEqual(first['company_logo'], 'https://img09.zhaopin.cn/2012/other/mobile/logo/10000000.png')
+
+
+if __name__ == '__main__':
+    unittest.main()